@@ -2,26 +2,56 @@
 import math
 
 class AppConfig:
+    # -------------------- Robot --------------------
+    ROBOT_IP = "192.168.123.161"
+
     # -------------------- Window / Camera --------------------
     WIN_NAME = "GO2 Camera + YOLO (Follow + Chair)"
     CAM_TIMEOUT_SEC = 2.0
+    CAM_BACKEND = "rpc"      # "rpc" (VideoClient polling) or "webrtc" (video stream)
+
+    # -------------------- Camera model --------------------
+    CAM_HFOV_DEG = 87.0
+    CAM_VFOV_DEG = 58.0
+    CAM_OFFSET_X = 0.30      # camera ahead of the body origin (m)
 
     # -------------------- YOLO / ROI --------------------
     MIN_CONF = 0.7
     MIN_BOX_FRAC = 0.05
     ROI_NORM = (0.33, 0.1, 0.67, 0.8)
-    SIZE_TOL = 0.08
+    TARGET_CLASS = "chair"
+    YOLO_IMGSZ = 640
+    DET_CAPACITY = 64
     CENTER_TOL = 0.10
 
+    # -------------------- Allocation report (tracemalloc) --------------------
+    ALLOC_REPORT = False
+    ALLOC_REPORT_EVERY = 100
+
     # -------------------- Motion Control --------------------
     MAX_VX = 0.40     # m/s
     MAX_WZ = 0.96     # rad/s
     K_WZ = 1.2
-    K_VX_FWD = 0.8
-    K_VX_BACK = 0.4
     SMOOTH_ALPHA = 0.2
     FOLLOW_DT = 0.04
 
+    # -------------------- Latency compensation --------------------
+    LATENCY_COMP = True
+    TARGET_HEIGHT_M = 0.85   # chair height used to infer range from box height
+    MAX_PREDICT_SEC = 0.5
+
+    # -------------------- Approach (range + trapezoidal profile) --------------------
+    CLASS_HEIGHTS_M = {"chair": TARGET_HEIGHT_M}
+    RANGE_FUSE_UWB = False       # blend UWB distance_est (only if the tag is on the target)
+    RANGE_UWB_WEIGHT = 0.3
+    STOP_RANGE_M = 1.1           # ~ box filling the ROI height, as with the old size ratio
+    RANGE_TOL_M = 0.08
+    HOLD_SETTLE_VX = 0.03        # m/s; HOLD only once the profile has braked below this
+    MAX_VX_BACK = 0.15
+    APPROACH_ACC = 0.5           # m/s^2
+    APPROACH_DEC = 0.4           # m/s^2
+    APPROACH_WZ_ACC = 2.0        # rad/s^2
+
     # -------------------- Follow controller (UWB) --------------------
     DEAD_BAND_D = 1.2
     DIST_SLOWDOWN = 1.0
@@ -35,7 +65,42 @@ class AppConfig:
     LOCK_MAX_MISS_FR = 10
     PREFER_ROI = True
 
+    # -------------------- Watchdog (seconds per stage) --------------------
+    WD_BUDGET_UWB = 0.5
+    WD_BUDGET_CAPTURE = 1.0
+    WD_BUDGET_INFERENCE = 1.0
+    WD_BUDGET_COMMAND = 0.25
+    WD_PERIOD = 0.05
+
+    # -------------------- Emergency stop (UWB X button) --------------------
+    ESTOP_DAMP = False           # Damp() instead of StopMove() after Move(0,0,0)
+    ESTOP_STEP_TIMEOUT = 0.5
+    ESTOP_TOTAL_TIMEOUT = 2.0
+
+    # -------------------- CPU placement --------------------
+    CONTROL_CPUS = (0,)          # reserved for FollowController + UWB threads
+    CONTROL_NICE = -10
+    CONTROL_RT_PRIORITY = 0      # > 0 uses SCHED_FIFO instead of nice
+    INFERENCE_THREADS = 0        # 0 = one per remaining core
+    PLACEMENT_REPORT_SEC = 10.0
+
+    # -------------------- On-demand profiler (SIGUSR1 / UWB combo) --------------------
+    PROFILE_SECONDS = 10.0
+    PROFILE_INTERVAL = 0.005
+    PROFILE_DIR = "profiles"
+    PROFILE_BUTTON_MASK = (1 << 0) | (1 << 1)   # UWB button bits held together; 0 disables
+
+    # -------------------- Telemetry --------------------
+    TELEMETRY = True
+    TELEMETRY_DIR = "telemetry"
+    TELEMETRY_SEGMENT_ROWS = 65536
+
     # -------------------- Behavior timing --------------------
     HOLD_SECONDS = 3.0
-    COOLDOWN_SECONDS = 30.0
+    COOLDOWN_SECONDS = 30.0        # global cooldown, only used while odometry is unavailable
+
+    # -------------------- Visited-target memory --------------------
+    VISIT_RADIUS_M = 0.8
+    VISIT_TTL_SEC = 600.0
+    VISIT_REARM_SECONDS = 2.0      # short re-arm after HOLD when visited targets are tracked
 
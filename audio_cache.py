@@ -0,0 +1,143 @@
+# Comments in English only
+import asyncio
+import fractions
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import av
+from aiortc.mediastreams import MediaStreamTrack
+
+SAMPLE_RATE = 48000
+FRAME_SAMPLES = 960          # 20 ms at 48 kHz (Opus frame size)
+LAYOUT = "stereo"
+FORMAT = "s16"
+FRAME_SEC = FRAME_SAMPLES / SAMPLE_RATE
+MAX_LAG_SEC = 0.1            # re-anchor pacing when the consumer fell this far behind
+
+
+# ------------ Decoded asset ------------
+class AudioClip:
+    """An audio file decoded once into fixed-size PCM frames ready for WebRTC."""
+
+    def __init__(self, path: str, frames: List[av.AudioFrame]):
+        self.path = path
+        self.frames = frames
+
+    @property
+    def duration(self) -> float:
+        return len(self.frames) * FRAME_SAMPLES / SAMPLE_RATE
+
+
+class AudioAssetCache:
+    """
+    Decodes each audio file once (resampled to 48 kHz s16 stereo, 20 ms frames)
+    and keeps the frames in memory. load() is thread-safe; the first call per file
+    pays the decode cost, so call it at startup to preload.
+    """
+
+    def __init__(self):
+        self._clips: Dict[str, AudioClip] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> AudioClip:
+        key = os.path.abspath(path)
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is None:
+                clip = AudioClip(key, self._decode(key))
+                self._clips[key] = clip
+                print(f"[AUDIO] Cached {os.path.basename(key)} ({clip.duration:.1f}s)")
+            return clip
+
+    @staticmethod
+    def _decode(path: str) -> List[av.AudioFrame]:
+        resampler = av.AudioResampler(format=FORMAT, layout=LAYOUT, rate=SAMPLE_RATE)
+        fifo = av.AudioFifo()
+        frames: List[av.AudioFrame] = []
+
+        with av.open(path) as container:
+            for frame in container.decode(audio=0):
+                for out in resampler.resample(frame):
+                    fifo.write(out)
+                while fifo.samples >= FRAME_SAMPLES:
+                    frames.append(fifo.read(FRAME_SAMPLES))
+        for out in resampler.resample(None):
+            fifo.write(out)
+        while fifo.samples >= FRAME_SAMPLES:
+            frames.append(fifo.read(FRAME_SAMPLES))
+        return frames
+
+
+# ------------ Track ------------
+def _silence_frame() -> av.AudioFrame:
+    frame = av.AudioFrame(format=FORMAT, layout=LAYOUT, samples=FRAME_SAMPLES)
+    for plane in frame.planes:
+        plane.update(bytes(plane.buffer_size))
+    frame.sample_rate = SAMPLE_RATE
+    return frame
+
+
+class PlaybackTrack(MediaStreamTrack):
+    """
+    A long-lived audio track added to the peer connection once.
+    It streams the current AudioClip in real time and silence when idle, so starting,
+    replacing or stopping a sound never touches the peer connection.
+    play()/stop() must run on the session loop (use WebRTCSession.call_soon).
+    """
+
+    kind = "audio"
+
+    def __init__(self):
+        super().__init__()
+        self._clip: Optional[AudioClip] = None
+        self._index = 0
+        self._silence = _silence_frame()
+        self._deadline: Optional[float] = None
+        self._pts = 0
+        self._time_base = fractions.Fraction(1, SAMPLE_RATE)
+
+    @property
+    def playing(self) -> bool:
+        return self._clip is not None
+
+    def reset_clock(self) -> None:
+        """Restart real-time pacing (call when the track is bound to a new connection)."""
+        self._deadline = None
+
+    def play(self, clip: AudioClip) -> None:
+        """Start clip from the beginning, replacing anything currently playing."""
+        self._clip = clip
+        self._index = 0
+
+    def stop(self) -> None:
+        """Switch back to silence."""
+        self._clip = None
+        self._index = 0
+
+    async def recv(self) -> av.AudioFrame:
+        # Pace output in real time from the previous frame's deadline; after a gap
+        # (reconnect, idle consumer) re-anchor to now instead of bursting to catch up
+        now = time.time()
+        if self._deadline is None or now - self._deadline > MAX_LAG_SEC:
+            self._deadline = now
+        else:
+            self._deadline += FRAME_SEC
+            wait = self._deadline - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+        self._pts += FRAME_SAMPLES
+
+        clip = self._clip
+        if clip is not None and self._index < len(clip.frames):
+            frame = clip.frames[self._index]
+            self._index += 1
+            if self._index >= len(clip.frames):
+                self._clip = None
+        else:
+            frame = self._silence
+
+        frame.pts = self._pts
+        frame.time_base = self._time_base
+        return frame
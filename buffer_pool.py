@@ -0,0 +1,230 @@
+# Comments in English only
+import math
+import tracemalloc
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+
+# ------------ Types ------------
+# One detection per row, pixel coordinates of the original frame
+DET_DTYPE = np.dtype([
+    ("conf", np.float32),
+    ("x1", np.float32),
+    ("y1", np.float32),
+    ("x2", np.float32),
+    ("y2", np.float32),
+    ("cls", np.int32),
+])
+
+
+# ------------ JPEG input ------------
+class FrameBufferPool:
+    """
+    Reusable byte buffer for the encoded JPEG sample returned by VideoClient.
+    The buffer only grows, so after the first few frames no input allocation happens.
+    Note: cv2.imdecode has no destination argument in Python, so the decoded
+    image itself is still allocated by OpenCV.
+    """
+
+    def __init__(self, initial_bytes: int = 256 * 1024):
+        self._jpeg = np.empty(initial_bytes, dtype=np.uint8)
+
+    def decode(self, data) -> Optional[np.ndarray]:
+        """Decode a JPEG sample (bytes or sequence of ints) to a BGR image."""
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            buf = np.frombuffer(data, dtype=np.uint8)   # zero-copy view
+        else:
+            n = len(data)
+            if n > self._jpeg.size:
+                self._jpeg = np.empty(max(n, 2 * self._jpeg.size), dtype=np.uint8)
+            buf = self._jpeg[:n]
+            buf[:] = data
+        return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+
+
+# ------------ Model input ------------
+class LetterboxBuffer:
+    """
+    Letterboxes frames into a persistent uint8 BGR canvas that is passed to model.predict().
+    Like ultralytics' own rectangular letterbox, the long side is scaled to imgsz and the
+    short side is padded only up to a multiple of `stride` (a 16:9 frame gives 384x640), so
+    predict() runs on the same pixel count as with the raw frame and its own letterbox is a
+    no-op resize. The canvas is reallocated only when the frame geometry changes.
+    Boxes predicted on the canvas are in canvas coordinates; DetectionBuffer.fill_from()
+    maps them back to frame pixels using scale/pad.
+    """
+
+    PAD_VALUE = 114
+
+    def __init__(self, imgsz: int = 640, stride: int = 32):
+        self.imgsz = imgsz
+        self.stride = stride
+        self.canvas: Optional[np.ndarray] = None
+        self._geom: Optional[Tuple[int, int]] = None
+        self._size = (imgsz, imgsz)
+        self.scale = 1.0
+        self.pad = (0, 0)
+
+    def load(self, img: np.ndarray) -> np.ndarray:
+        """Letterbox a BGR frame into the persistent canvas and return it."""
+        h, w = img.shape[:2]
+        if self._geom != (h, w):
+            # Geometry changed: recompute placement and size the canvas to stride multiples
+            s, st = self.imgsz, self.stride
+            self.scale = min(s / h, s / w)
+            nw, nh = int(round(w * self.scale)), int(round(h * self.scale))
+            cw, ch = math.ceil(nw / st) * st, math.ceil(nh / st) * st
+            self.pad = ((cw - nw) // 2, (ch - nh) // 2)
+            self._size = (nw, nh)
+            self.canvas = np.full((ch, cw, 3), self.PAD_VALUE, dtype=np.uint8)
+            self._geom = (h, w)
+
+        nw, nh = self._size
+        left, top = self.pad
+        cv2.resize(img, (nw, nh), dst=self.canvas[top:top + nh, left:left + nw],
+                   interpolation=cv2.INTER_LINEAR)
+        return self.canvas
+
+
+# ------------ Detections ------------
+class DetectionBuffer:
+    """
+    Fixed-capacity structured array of detections (see DET_DTYPE).
+    view() returns the filled rows without copying; TargetLock consumes it directly.
+    Raw model output, selection masks and integer draw boxes use persistent scratch buffers.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.data = np.zeros(capacity, dtype=DET_DTYPE)
+        self.count = 0
+        self._raw = torch.zeros((capacity, 6), dtype=torch.float32)
+        self._raw_np = self._raw.numpy()                      # shares memory
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._tmp_mask = np.zeros(capacity, dtype=bool)
+        self._tmp = np.zeros(capacity, dtype=np.float32)
+        self._ibox = np.zeros((capacity, 4), dtype=np.int32)
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.count]
+
+    def fill_from(self, det: Optional[torch.Tensor], letterbox: LetterboxBuffer) -> None:
+        """
+        Copy raw model output rows (x1, y1, x2, y2, conf, cls) in canvas coordinates
+        (e.g. res.boxes.data, on any device) into the buffer, mapped back to frame pixels.
+        Extra rows beyond capacity are dropped.
+        """
+        if det is None:
+            self.count = 0
+            return
+        n = min(int(det.shape[0]), self.data.size)
+        self.count = n
+        if n == 0:
+            return
+
+        self._raw[:n].copy_(det[:n])
+        raw = self._raw_np
+        out = self.data[:n]
+        s = letterbox.scale
+        padx, pady = letterbox.pad
+        for col, key, pad in ((0, "x1", padx), (1, "y1", pady), (2, "x2", padx), (3, "y2", pady)):
+            np.subtract(raw[:n, col], pad, out=out[key])
+            np.divide(out[key], s, out=out[key])
+        out["conf"] = raw[:n, 4]
+        out["cls"] = raw[:n, 5]
+
+    def select_from(self, src: "DetectionBuffer", cls_id: int,
+                    min_conf: float, min_h: float) -> None:
+        """Keep rows of src with the given class, confidence and minimum box height."""
+        n = src.count
+        rows = src.view()
+        mask, tmp_mask, tmp = self._mask[:n], self._tmp_mask[:n], self._tmp[:n]
+
+        np.equal(rows["cls"], cls_id, out=mask)
+        np.greater_equal(rows["conf"], min_conf, out=tmp_mask)
+        np.logical_and(mask, tmp_mask, out=mask)
+        np.subtract(rows["y2"], rows["y1"], out=tmp)
+        np.greater_equal(tmp, min_h, out=tmp_mask)
+        np.logical_and(mask, tmp_mask, out=mask)
+
+        k = int(np.count_nonzero(mask))
+        np.compress(mask, rows, out=self.data[:k])
+        self.count = k
+
+    def draw(self, img: np.ndarray, color, thickness: int = 1) -> None:
+        """Draw all boxes, converting coordinates through the persistent int buffer."""
+        n = self.count
+        if n == 0:
+            return
+        ibox = self._ibox[:n]
+        for i, key in enumerate(("x1", "y1", "x2", "y2")):
+            np.copyto(ibox[:, i], self.data[key][:n], casting="unsafe")
+        for x1, y1, x2, y2 in ibox.tolist():
+            cv2.rectangle(img, (x1, y1), (x2, y2), color, thickness)
+
+
+# ------------ Allocation report ------------
+class AllocationReport:
+    """
+    Per-frame allocation accounting with tracemalloc (disabled by default: tracing is costly).
+    Use begin_frame()/end_frame() around one iteration; every `every` frames it prints the
+    average net/peak bytes per frame and the top allocation sites since the last report.
+    tracemalloc only sees allocations made through Python's allocator (Python objects and
+    numpy arrays); torch's CPU allocator and OpenCV's internal buffers are invisible to it,
+    so the report cannot show allocations inside model.predict().
+    """
+
+    def __init__(self, enabled: bool = False, every: int = 100, top: int = 8):
+        self.enabled = enabled
+        self.every = every
+        self.top = top
+        self._frames = 0
+        self._net_sum = 0
+        self._peak_sum = 0
+        self._t0_bytes = 0
+        self._snapshot = None
+        if enabled:
+            tracemalloc.start(1)
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        tracemalloc.reset_peak()
+        self._t0_bytes, _ = tracemalloc.get_traced_memory()
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        cur, peak = tracemalloc.get_traced_memory()
+        self._net_sum += cur - self._t0_bytes
+        self._peak_sum += peak - self._t0_bytes
+        self._frames += 1
+        if self._frames >= self.every:
+            self._report()
+
+    def _report(self) -> None:
+        n = self._frames
+        print(f"[ALLOC] {n} frames: net {self._net_sum / n:.0f} B/frame, "
+              f"peak {self._peak_sum / n:.0f} B/frame")
+        snap = tracemalloc.take_snapshot()
+        for stat in snap.compare_to(self._snapshot, "lineno")[:self.top]:
+            print(f"[ALLOC]   {stat}")
+        self._snapshot = snap
+        self._frames = self._net_sum = self._peak_sum = 0
+
+
+# ------------ Bundle ------------
+@dataclass
+class VisionBuffers:
+    letterbox: LetterboxBuffer
+    detections: DetectionBuffer   # every detection, used for drawing
+    candidates: DetectionBuffer   # target-class detections fed to TargetLock
+    target_cls: int
+    alloc: AllocationReport
@@ -1,20 +1,28 @@
 # Comments in English only
-import cv2
-import numpy as np
+import time
+import logging
 
 # Unitree SDK
 from unitree_sdk2py.go2.video.video_client import VideoClient
 
+from buffer_pool import FrameBufferPool
+
+logger = logging.getLogger(__name__)
+
 
 class Camera:
     """
     Simple wrapper around Unitree VideoClient.
     - get_frame() returns a BGR OpenCV image (np.ndarray) or None on failure.
+    - get_frame_stamped() returns (image, t_capture) where t_capture is a time.monotonic()
+      estimate of when the image was grabbed, or (None, None) on failure.
     - close() releases underlying resources.
     - Can be used as a context manager (with ... as cam:).
     """
 
-    def __init__(self, timeout_sec: float = 2.0):
+    def __init__(self, timeout_sec: float = 2.0, pool: FrameBufferPool | None = None):
+        self._pool = pool or FrameBufferPool()
+        self._errors = 0
         self._client = VideoClient()
         # Set RPC timeout for image retrieval
         self._client.SetTimeout(timeout_sec)
@@ -23,21 +31,32 @@ class Camera:
 
     def get_frame(self):
         """Fetch a single JPEG frame and decode to BGR; return None if unavailable."""
+        img, _ = self.get_frame_stamped()
+        return img
+
+    def get_frame_stamped(self):
+        """Fetch a frame together with its capture timestamp (time.monotonic())."""
         try:
+            t_req = time.monotonic()
             code, data = self._client.GetImageSample()
+            t_rsp = time.monotonic()
             if code != 0 or not data:
-                return None
+                return None, None
+
+            # The image is grabbed somewhere inside the RPC; take the midpoint
+            t_capture = 0.5 * (t_req + t_rsp)
 
-            # Decode JPEG buffer -> BGR image
-            buf = np.frombuffer(bytes(data), dtype=np.uint8)
-            img = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+            # Decode JPEG buffer -> BGR image (input bytes go through the reusable pool)
+            img = self._pool.decode(data)
             if img is None or img.size == 0:
-                return None
-            return img
+                return None, None
+            return img, t_capture
 
         except Exception as e:
-            print(f"[CAM] Error: {e}")
-            return None
+            self._errors += 1
+            if self._errors == 1 or self._errors % 100 == 0:
+                logger.warning("[CAM] Error (#%d): %s", self._errors, e)
+            return None, None
 
     def close(self):
         """Release camera resources (idempotent)."""
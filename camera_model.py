@@ -0,0 +1,33 @@
+# Comments in English only
+import math
+from dataclasses import dataclass
+
+
+@dataclass
+class CameraModel:
+    """
+    Pinhole approximation of the Go2 front camera built from its field of view.
+    Focal lengths are derived per frame size, so the model works at any resolution.
+    """
+    hfov_deg: float = 87.0
+    vfov_deg: float = 58.0
+
+    def fx(self, width: int) -> float:
+        """Horizontal focal length in pixels for an image of the given width."""
+        return 0.5 * width / math.tan(0.5 * math.radians(self.hfov_deg))
+
+    def fy(self, height: int) -> float:
+        """Vertical focal length in pixels for an image of the given height."""
+        return 0.5 * height / math.tan(0.5 * math.radians(self.vfov_deg))
+
+    def bearing(self, cx: float, width: int) -> float:
+        """Bearing (rad, positive to the left) of a pixel column relative to the optical axis."""
+        return -math.atan2(cx - 0.5 * width, self.fx(width))
+
+    def column(self, bearing: float, width: int) -> float:
+        """Inverse of bearing(): pixel column of a ray at the given bearing."""
+        return 0.5 * width - self.fx(width) * math.tan(bearing)
+
+    def range_from_height(self, box_h: float, height: int, object_h: float) -> float:
+        """Metric range to an upright object of known height from its box height in pixels."""
+        return self.fy(height) * object_h / max(box_h, 1.0)
@@ -0,0 +1,132 @@
+# Comments in English only
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+
+# ------------ Config ------------
+@dataclass
+class EStopConfig:
+    damp: bool = False            # Damp() instead of StopMove() after the zero-velocity command
+    step_timeout: float = 0.5     # bound for each shutdown step
+    total_timeout: float = 2.0    # bound for the whole shutdown sequence
+    exit_process: bool = True     # os._exit(0) once the sequence is done
+
+
+# ------------ Emergency stop ------------
+class EmergencyStop:
+    """
+    Pre-bound emergency stop with a measured button-to-stop latency.
+    - trigger() is called straight from the DDS callback: it sets the stop event, sends
+      Move(0, 0, 0) and StopMove()/Damp() on the already-initialised clients, and logs
+      the latency of each command relative to the press timestamp.
+    - A shutdown thread started at init then runs the registered steps in order, each one
+      bounded by step_timeout (and all of them by total_timeout), and exits the process.
+    - shutdown() is the single cleanup path for normal exits too: the sequence runs once,
+      and a concurrent caller waits for the run in progress instead of repeating it.
+    """
+
+    def __init__(self, avoid_client: Any, sport_client: Any, stop_event: threading.Event,
+                 config: Optional[EStopConfig] = None, placement: Any = None):
+        self.avoid_client = avoid_client
+        self.sport_client = sport_client
+        self.stop_event = stop_event
+        self.cfg = config or EStopConfig()
+        self.placement = placement
+        self.engaged = False
+        self.latency_ms: Optional[float] = None
+        self._steps: List[Tuple[int, str, Callable[[], Any]]] = []
+        self._triggered = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._shutdown_lock = threading.Lock()
+        self._shutdown_started = False
+        self._shutdown_done = threading.Event()
+
+    def add_shutdown_step(self, name: str, fn: Callable[[], Any], order: int = 50) -> None:
+        """Register a cleanup step; lower order runs first (ties keep registration order)."""
+        self._steps.append((order, name, fn))
+
+    def start(self) -> None:
+        """Pre-start the shutdown thread so nothing is spawned at press time."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._shutdown_loop, name="estop", daemon=True)
+        self._thread.start()
+
+    def trigger(self, t_press: Optional[float] = None) -> None:
+        """Stop the robot now (safe to call from the DDS callback; idempotent)."""
+        if self.engaged:
+            return
+        self.engaged = True
+        t0 = time.monotonic() if t_press is None else t_press
+
+        # Stop the follow loop from sending anything after us
+        self.stop_event.set()
+
+        try:
+            self.avoid_client.Move(0.0, 0.0, 0.0)
+        except Exception as e:
+            print(f"[ESTOP] Move(0,0,0) error: {e}")
+        t_move = time.monotonic()
+
+        action = "Damp" if self.cfg.damp else "StopMove"
+        try:
+            if self.cfg.damp:
+                self.sport_client.Damp()
+            else:
+                self.sport_client.StopMove()
+        except Exception as e:
+            print(f"[ESTOP] {action} error: {e}")
+        t_stop = time.monotonic()
+
+        self.latency_ms = (t_move - t0) * 1e3
+        print(f"[ESTOP] Move(0,0,0) sent {self.latency_ms:.1f} ms after press, "
+              f"{action} {(t_stop - t0) * 1e3:.1f} ms after press.")
+        self._triggered.set()
+
+    def shutdown(self) -> None:
+        """Run the registered steps once (idempotent, thread-safe); later callers wait for it."""
+        with self._shutdown_lock:
+            started, self._shutdown_started = self._shutdown_started, True
+        if started:
+            self._shutdown_done.wait(self.cfg.total_timeout + self.cfg.step_timeout)
+            return
+        try:
+            self._run_steps()
+        finally:
+            self._shutdown_done.set()
+
+    # -------------------- Internal --------------------
+    def _shutdown_loop(self):
+        if self.placement is not None:
+            self.placement.place_current_thread("estop")
+        self._triggered.wait()
+        self.shutdown()
+        if self.cfg.exit_process:
+            os._exit(0)
+
+    def _run_steps(self):
+        t_start = time.monotonic()
+        deadline = t_start + self.cfg.total_timeout
+        for _, name, fn in sorted(self._steps, key=lambda s: s[0]):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"[ESTOP] Shutdown budget exhausted, skipping '{name}'.")
+                continue
+            t = time.monotonic()
+            worker = threading.Thread(target=self._run_step, args=(name, fn), daemon=True)
+            worker.start()
+            worker.join(timeout=min(self.cfg.step_timeout, remaining))
+            status = "timed out" if worker.is_alive() else "done"
+            print(f"[ESTOP] {name}: {status} in {(time.monotonic() - t) * 1e3:.0f} ms")
+
+        print(f"[ESTOP] Shutdown sequence finished in {(time.monotonic() - t_start) * 1e3:.0f} ms.")
+
+    @staticmethod
+    def _run_step(name: str, fn: Callable[[], Any]) -> None:
+        try:
+            fn()
+        except Exception as e:
+            print(f"[ESTOP] {name} error: {e}")
@@ -2,9 +2,11 @@
 import time
 import math
 import threading
+import logging
 from dataclasses import dataclass
 from typing import Any, Dict
 
+logger = logging.getLogger(__name__)
 
 @dataclass
 class FollowConfig:
@@ -35,11 +37,20 @@ class FollowController:
         avoid_client: Any,
         behavior: Dict[str, Any],
         config: FollowConfig | None = None,
+        history: Any = None,
+        watchdog: Any = None,
+        telemetry: Any = None,
+        placement: Any = None,
     ):
         self.state_manager = state_manager
         self.avoid_client = avoid_client
         self.behavior = behavior
         self.cfg = config or FollowConfig()
+        self.history = history  # optional CommandHistory fed with every sent command
+        self.watchdog = watchdog  # optional Watchdog: receives "command" beats, gates stale UWB
+        self.telemetry = telemetry  # optional TelemetryRecorder: one control row per cycle
+        self.placement = placement  # optional ResourcePlacement: pins this loop to reserved cores
+        self._errors = 0
         self._thread: threading.Thread | None = None
 
     def start(self, stop_event: threading.Event, daemon: bool = True) -> None:
@@ -59,6 +70,8 @@ class FollowController:
     # -------------------- Internal loop --------------------
     def _run_loop(self, stop_evt: threading.Event):
         vx_cmd, wz_cmd = 0.0, 0.0
+        if self.placement is not None:
+            self.placement.place_current_thread("control")
 
         while not stop_evt.is_set():
             # --- Read UWB estimates ---
@@ -89,6 +102,10 @@ class FollowController:
                     wz_follow = math.copysign(self.cfg.MAX_WZ_FOLLOW * scale, err_o)
                     wz_follow = max(-self.cfg.MAX_WZ_FOLLOW, min(self.cfg.MAX_WZ_FOLLOW, wz_follow))
 
+            # Never follow stale UWB data
+            if self.watchdog is not None and self.watchdog.is_stale("uwb"):
+                vx_follow, wz_follow = 0.0, 0.0
+
             # --- Blend with behavior state ---
             mode = self.behavior.get("mode", "FOLLOW")
             if mode in ("APPROACH", "HOLD"):
@@ -99,11 +116,30 @@ class FollowController:
                 wz_t = wz_follow
 
 
+            # An emergency stop may have fired while this cycle was computing
+            if stop_evt.is_set():
+                break
+
             # Send command
+            error = False
+            t_send = time.monotonic()
             try:
                 self.avoid_client.Move(vx_t, 0.0, wz_t)
+                if self.history is not None:
+                    self.history.record(vx_t, wz_t)
+                if self.watchdog is not None:
+                    self.watchdog.beat("command", time.monotonic() - t_send)
             except Exception as e:
-                print(f"[FOLLOW MOVE] Error: {e}")
+                error = True
+                self._errors += 1
+                if self._errors == 1 or self._errors % 100 == 0:
+                    logger.warning("[FOLLOW MOVE] Error (#%d): %s", self._errors, e)
+
+            if self.telemetry is not None:
+                self.telemetry.record_control(
+                    t_send, mode, vx_t, wz_t, dis, ori,
+                    (time.monotonic() - t_send) * 1e3, error,
+                )
 
             time.sleep(self.cfg.FOLLOW_DT)
 
@@ -0,0 +1,122 @@
+# Comments in English only
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional, Tuple
+
+from camera_model import CameraModel
+
+Box = Tuple[float, float, float, float]
+
+
+# ------------ Command history ------------
+class CommandHistory:
+    """
+    Thread-safe ring of velocity commands actually sent to the robot.
+    Each entry (t, vx, wz) is assumed to hold until the next entry (zero-order hold).
+    Timestamps use time.monotonic().
+    """
+
+    def __init__(self, maxlen: int = 256):
+        self._cmds: Deque[Tuple[float, float, float]] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, vx: float, wz: float, t: Optional[float] = None) -> None:
+        stamp = time.monotonic() if t is None else t
+        with self._lock:
+            self._cmds.append((stamp, float(vx), float(wz)))
+
+    def integrate(self, t0: float, t1: float) -> Tuple[float, float]:
+        """Return (forward distance [m], yaw change [rad]) commanded over [t0, t1]."""
+        if t1 <= t0:
+            return 0.0, 0.0
+        with self._lock:
+            cmds = list(self._cmds)
+        if not cmds:
+            return 0.0, 0.0
+
+        dist, yaw = 0.0, 0.0
+        for i, (ts, vx, wz) in enumerate(cmds):
+            te = cmds[i + 1][0] if i + 1 < len(cmds) else t1
+            a, b = max(ts, t0), min(te, t1)
+            if b > a:
+                dist += vx * (b - a)
+                yaw += wz * (b - a)
+        return dist, yaw
+
+
+# ------------ Config ------------
+@dataclass
+class LatencyConfig:
+    enabled: bool = True
+    target_height_m: float = 0.85   # physical height of the approached object
+    max_predict_sec: float = 0.5    # never extrapolate further than this
+    delay_ema_alpha: float = 0.1
+
+
+# ------------ Compensator ------------
+class LatencyCompensator:
+    """
+    Forward-predicts a lock box from its capture time to "now" using the command history.
+    Yaw shifts the box horizontally by the commanded rotation; forward motion grows it
+    according to the range implied by its height. Also tracks the measured pipeline delay.
+    """
+
+    def __init__(self, history: CommandHistory, camera: CameraModel,
+                 config: Optional[LatencyConfig] = None):
+        self.history = history
+        self.camera = camera
+        self.cfg = config or LatencyConfig()
+        self.delay_last: float = 0.0
+        self.delay_avg: float = 0.0
+        self.delay_max: float = 0.0
+
+    def measure(self, t_capture: float, t_now: Optional[float] = None) -> float:
+        """Record and return the capture-to-now delay in seconds."""
+        now = time.monotonic() if t_now is None else t_now
+        delay = max(0.0, now - t_capture)
+        self.delay_last = delay
+        if self.delay_avg == 0.0:
+            self.delay_avg = delay
+        else:
+            a = self.cfg.delay_ema_alpha
+            self.delay_avg = (1.0 - a) * self.delay_avg + a * delay
+        self.delay_max = max(self.delay_max, delay)
+        return delay
+
+    def predict(self, box: Box, frame_w: int, frame_h: int,
+                t_capture: float, t_now: Optional[float] = None) -> Box:
+        """Return the box as it should appear at t_now given the motion since t_capture."""
+        now = time.monotonic() if t_now is None else t_now
+        if not self.cfg.enabled:
+            return box
+
+        t0 = max(t_capture, now - self.cfg.max_predict_sec)
+        dist, yaw = self.history.integrate(t0, now)
+        if dist == 0.0 and yaw == 0.0:
+            return box
+
+        x1, y1, x2, y2 = box
+        cx, cy = 0.5 * (x1 + x2), 0.5 * (y1 + y2)
+        bw, bh = x2 - x1, y2 - y1
+
+        # Rotation: a CCW turn moves the target towards the right edge of the image
+        bearing = self.camera.bearing(cx, frame_w)
+        new_bearing = bearing - yaw
+        if abs(new_bearing) >= 0.5 * math.pi:
+            return box
+        new_cx = self.camera.column(new_bearing, frame_w)
+
+        # Translation: closing distance along the bearing scales the box
+        rng = self.camera.range_from_height(bh, frame_h, self.cfg.target_height_m)
+        new_rng = max(rng - dist * math.cos(bearing), 0.1)
+        scale = rng / new_rng
+
+        hw, hh = 0.5 * bw * scale, 0.5 * bh * scale
+        return (new_cx - hw, cy - hh, new_cx + hw, cy + hh)
+
+    def report(self) -> str:
+        return (f"delay last={self.delay_last * 1e3:.0f}ms "
+                f"avg={self.delay_avg * 1e3:.0f}ms max={self.delay_max * 1e3:.0f}ms")
@@ -0,0 +1,39 @@
+# Comments in English only
+import math
+
+
+class TrapezoidalProfile:
+    """
+    Velocity/acceleration-limited 1-D approach to a goal.
+    step(remaining, dt) returns the next velocity command: it accelerates at max_acc up to
+    the cruise limit, then brakes at max_dec so it reaches zero velocity at the goal.
+    Negative remaining moves backwards, limited by max_v_back.
+    With tol > 0 the profile plans to stop at the edge of the +/- tol band, so it is already
+    at (near) zero velocity when the goal counts as reached; inside the band it only brakes.
+    """
+
+    def __init__(self, max_v: float, max_acc: float, max_dec: float | None = None,
+                 max_v_back: float | None = None):
+        self.max_v = max_v
+        self.max_acc = max_acc
+        self.max_dec = max_dec if max_dec is not None else max_acc
+        self.max_v_back = max_v_back if max_v_back is not None else max_v
+        self.v = 0.0
+
+    def reset(self, v: float = 0.0) -> None:
+        self.v = v
+
+    def settled(self, v_eps: float) -> bool:
+        """True once the commanded velocity has come down to within v_eps of zero."""
+        return abs(self.v) <= v_eps
+
+    def step(self, remaining: float, dt: float, tol: float = 0.0) -> float:
+        limit = self.max_v if remaining >= 0.0 else self.max_v_back
+        # Fastest speed from which we can still stop at the tolerance edge
+        dist = max(0.0, abs(remaining) - tol)
+        v_goal = math.copysign(min(limit, math.sqrt(2.0 * self.max_dec * dist)), remaining)
+
+        braking = abs(v_goal) < abs(self.v) and v_goal * self.v >= 0.0
+        dv_max = (self.max_dec if braking else self.max_acc) * dt
+        self.v += max(-dv_max, min(dv_max, v_goal - self.v))
+        return self.v
@@ -1,61 +1,52 @@
 # -------------------- Audio Class --------------------
-import asyncio
 import os
-import threading
-from go2_webrtc_driver.webrtc_driver import Go2WebRTCConnection, WebRTCConnectionMethod
-from aiortc.contrib.media import MediaPlayer
+
+from webrtc_session import DEFAULT_IP, get_session
+from audio_cache import AudioAssetCache, PlaybackTrack
+
 
 class music_player:
-    def __init__(self, ip="192.168.123.161"):
-        self.ip = ip
-        self.loop = asyncio.new_event_loop()
-        self.thread = threading.Thread(target=self._start_background_loop, daemon=True)
-        self.conn = None
-        self.player = None
-        self.is_playing = False
-        self.thread.start()
-
-    def _start_background_loop(self):
-        """Runs the asyncio loop in a background thread."""
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_until_complete(self._connect())
-        self.loop.run_forever()
-
-    async def _connect(self):
-        """Internal async connection setup."""
-        try:
-            print("[AUDIO] Connecting to WebRTC...")
-            self.conn = Go2WebRTCConnection(WebRTCConnectionMethod.LocalSTA, ip=self.ip)
-            await self.conn.connect()
-            print("[AUDIO] Connected.")
-        except Exception as e:
-            print(f"[AUDIO] Connection failed: {e}")
+    """
+    Plays audio files through the shared WebRTC session.
+    Files are decoded once by the AudioAssetCache; a single PlaybackTrack stays attached
+    to the peer connection (re-attached after reconnects) and switches between clips.
+    """
 
-    async def _play_async(self, file_path):
-        """Internal async play logic."""
-        if self.is_playing or not self.conn:
-            return
-        
-        try:
-            self.player = MediaPlayer(file_path)
-            if self.conn.pc:
-                self.conn.pc.addTrack(self.player.audio)
-                self.is_playing = True
-                print(f"[AUDIO] Playing: {file_path}")
-        except Exception as e:
-            print(f"[AUDIO] Play error: {e}")
+    def __init__(self, ip=DEFAULT_IP, session=None, cache=None):
+        self.session = session or get_session(ip)
+        self.cache = cache or AudioAssetCache()
+        self.track = PlaybackTrack()
+        self.session.add_listener(self._attach)
 
-    async def _stop_async(self):
-        """Internal async stop logic."""
-        if self.player and self.is_playing:
-            self.player = None # Releasing player stops stream
-            self.is_playing = False
-            print("[AUDIO] Stopped.")
+    def _attach(self, conn):
+        """Bind the playback track to a fresh peer connection."""
+        if conn.pc:
+            self.track.reset_clock()
+            conn.pc.addTrack(self.track)
+            print("[AUDIO] Playback track attached.")
+
+    @staticmethod
+    def _path(filename):
+        return os.path.join(os.path.dirname(__file__), filename)
+
+    @property
+    def is_playing(self):
+        return self.track.playing
 
     # --- Public Methods (Call these from your Main Loop) ---
+    def preload(self, filename="dora-doradura-mp3.mp3"):
+        """Decode a file into the cache ahead of time (blocking)."""
+        self.cache.load(self._path(filename))
+
     def play(self, filename="dora-doradura-mp3.mp3"):
-        mp3_path = os.path.join(os.path.dirname(__file__), filename)
-        asyncio.run_coroutine_threadsafe(self._play_async(mp3_path), self.loop)
+        """Play a file, replacing whatever is currently playing."""
+        try:
+            clip = self.cache.load(self._path(filename))
+        except Exception as e:
+            print(f"[AUDIO] Play error: {e}")
+            return
+        self.session.call_soon(self.track.play, clip)
+        print(f"[AUDIO] Playing: {clip.path}")
 
     def stop(self):
-        asyncio.run_coroutine_threadsafe(self._stop_async(), self.loop)
\ No newline at end of file
+        self.session.call_soon(self.track.stop)
@@ -0,0 +1,18 @@
+from unitree_sdk2py.idl.unitree_go.msg.dds_ import SportModeState_
+
+
+class OdometryStateManager:
+    """Latest robot pose from rt/sportmodestate (odometry frame)."""
+
+    def __init__(self):
+        self.state = None
+
+    def update_state(self, msg: SportModeState_):
+        self.state = msg
+
+    def pose(self):
+        """(x, y, yaw) in the odometry frame, or None before the first message."""
+        msg = self.state
+        if msg is None:
+            return None
+        return (float(msg.position[0]), float(msg.position[1]), float(msg.imu_state.rpy[2]))
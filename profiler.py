@@ -0,0 +1,136 @@
+# Comments in English only
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+# ------------ Config ------------
+@dataclass
+class ProfilerConfig:
+    duration: float = 10.0      # length of one capture (s)
+    interval: float = 0.005     # sampling period (s), 200 Hz
+    out_dir: str = "profiles"
+    max_depth: int = 64
+    top: int = 40               # functions listed in the stats file
+
+
+# ------------ Sampling profiler ------------
+class SamplingProfiler:
+    """
+    On-demand, time-boxed sampling profiler for all Python threads.
+    While idle it is a single thread blocked on an Event, so it costs nothing.
+    request() (signal handler, UWB button combo, ...) starts one capture of `duration`
+    seconds that samples sys._current_frames() and writes, into out_dir:
+      - profile_<stamp>.folded : collapsed stacks "thread;outer;...;leaf count" (flamegraph.pl,
+                                 speedscope, inferno)
+      - profile_<stamp>.txt    : per-function total/self sample counts
+    Requests arriving during a capture are ignored.
+    """
+
+    def __init__(self, config: ProfilerConfig | None = None):
+        self.cfg = config or ProfilerConfig()
+        self._requested = threading.Event()
+        self._busy = False
+        self._thread: threading.Thread | None = None
+
+    def request(self) -> bool:
+        """Ask for a capture; returns False if one is already running. Signal-safe."""
+        if self._busy:
+            return False
+        self._requested.set()
+        return True
+
+    def install_signal(self, signum: int = getattr(signal, "SIGUSR1", 0)) -> bool:
+        """Trigger captures with a signal (main thread only, POSIX only)."""
+        if not signum:
+            return False
+        signal.signal(signum, lambda s, f: self.request())
+        return True
+
+    def start(self, stop_event: threading.Event, daemon: bool = True) -> None:
+        """Start the idle capture thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run_loop, args=(stop_event,), name="profiler", daemon=daemon
+        )
+        self._thread.start()
+
+    # -------------------- Internal --------------------
+    def _run_loop(self, stop_evt: threading.Event):
+        while not stop_evt.is_set():
+            if not self._requested.wait(timeout=0.5):
+                continue
+            self._busy = True
+            try:
+                self._capture(stop_evt)
+            except Exception as e:
+                print(f"[PROFILE] Capture failed: {e}")
+            finally:
+                self._requested.clear()
+                self._busy = False
+
+    @staticmethod
+    def _label(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _capture(self, stop_evt: threading.Event) -> None:
+        print(f"[PROFILE] Sampling all threads for {self.cfg.duration:.0f}s...")
+        own = threading.get_ident()
+        stacks: Counter = Counter()
+        total: Counter = Counter()
+        self_: Counter = Counter()
+        names: Dict[int, str] = {}
+        samples = 0
+
+        t_end = time.monotonic() + self.cfg.duration
+        t_names = 0.0
+        while time.monotonic() < t_end and not stop_evt.is_set():
+            now = time.monotonic()
+            if now >= t_names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                t_names = now + 1.0
+
+            for tid, frame in sys._current_frames().items():
+                if tid == own:
+                    continue
+                chain: List[str] = []
+                f = frame
+                while f is not None and len(chain) < self.cfg.max_depth:
+                    chain.append(self._label(f.f_code))
+                    f = f.f_back
+                if not chain:
+                    continue
+                chain.reverse()
+                stacks[";".join([names.get(tid, str(tid))] + chain)] += 1
+                self_[chain[-1]] += 1
+                for label in set(chain):
+                    total[label] += 1
+                samples += 1
+
+            time.sleep(self.cfg.interval)
+
+        self._write(stacks, total, self_, samples)
+
+    def _write(self, stacks: Counter, total: Counter, self_: Counter, samples: int) -> None:
+        os.makedirs(self.cfg.out_dir, exist_ok=True)
+        base = os.path.join(self.cfg.out_dir, time.strftime("profile_%Y%m%d_%H%M%S"))
+
+        with open(base + ".folded", "w") as f:
+            for stack, n in stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+        with open(base + ".txt", "w") as f:
+            f.write(f"# {samples} thread samples over {self.cfg.duration:.1f}s "
+                    f"at {1.0 / self.cfg.interval:.0f} Hz\n")
+            f.write(f"{'total%':>7} {'self%':>7}  function\n")
+            denom = max(samples, 1)
+            for label, n in total.most_common(self.cfg.top):
+                f.write(f"{100.0 * n / denom:7.1f} {100.0 * self_[label] / denom:7.1f}  {label}\n")
+
+        print(f"[PROFILE] Wrote {base}.folded and {base}.txt")
@@ -0,0 +1,52 @@
+# Comments in English only
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from camera_model import CameraModel
+
+Box = Tuple[float, float, float, float]
+
+
+# ------------ Config ------------
+@dataclass
+class RangeConfig:
+    class_heights_m: Dict[str, float] = field(default_factory=lambda: {"chair": 0.85})
+    default_height_m: float = 0.85   # used for classes missing from class_heights_m
+    fuse_uwb: bool = False      # only meaningful when the UWB tag sits on the target
+    uwb_weight: float = 0.3     # weight of distance_est in the fused range
+    smooth_alpha: float = 0.5   # EMA weight of the newest estimate
+
+
+# ------------ Range estimator ------------
+class RangeEstimator:
+    """
+    Metric range to a detected object from its box height, the camera intrinsics and a
+    known per-class object height; optionally blended with the UWB distance estimate.
+    Call reset() when a new target is acquired.
+    """
+
+    def __init__(self, camera: CameraModel, config: Optional[RangeConfig] = None):
+        self.camera = camera
+        self.cfg = config or RangeConfig()
+        self.range: Optional[float] = None
+
+    def reset(self) -> None:
+        self.range = None
+
+    def estimate(self, box: Box, frame_h: int, cls_name: str,
+                 uwb_dist: Optional[float] = None) -> float:
+        """Smoothed range (m) to the object in box."""
+        obj_h = self.cfg.class_heights_m.get(cls_name, self.cfg.default_height_m)
+
+        x1, y1, x2, y2 = box
+        r = self.camera.range_from_height(y2 - y1, frame_h, obj_h)
+        if self.cfg.fuse_uwb and uwb_dist is not None and uwb_dist > 0.0:
+            w = self.cfg.uwb_weight
+            r = (1.0 - w) * r + w * uwb_dist
+
+        if self.range is None:
+            self.range = r
+        else:
+            a = self.cfg.smooth_alpha
+            self.range = (1.0 - a) * self.range + a * r
+        return self.range
@@ -0,0 +1,144 @@
+# Comments in English only
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# ------------ Config ------------
+@dataclass
+class PlacementConfig:
+    control_cpus: Tuple[int, ...] = (0,)   # cores reserved for control + UWB threads
+    control_nice: int = -10                # nice for reserved threads (needs CAP_SYS_NICE)
+    control_rt_priority: int = 0           # > 0: SCHED_FIFO with this priority instead of nice
+    inference_threads: int = 0             # torch intra-op threads; 0 = one per remaining core
+    report_period: float = 10.0            # runtime per-thread CPU report; 0 disables
+
+
+# ------------ Placement ------------
+class ResourcePlacement:
+    """
+    Deterministic CPU placement for the control loop vs. inference (Linux).
+    - place_current_thread("control" | "uwb") pins the calling thread to the reserved cores
+      and raises its priority when permitted.
+    - configure_inference() pins the calling (main) thread to the remaining cores before any
+      helper thread is spawned, so every later thread (torch/OpenMP workers, DDS, WebRTC,
+      watchdog) inherits that mask, and caps torch's pool. Control and UWB threads then
+      move themselves onto the reserved cores with place_current_thread().
+    Every step degrades to a recorded note when the OS or privileges do not allow it.
+    """
+
+    def __init__(self, config: Optional[PlacementConfig] = None):
+        self.cfg = config or PlacementConfig()
+        self._supported = hasattr(os, "sched_setaffinity")
+        self.all_cpus: Set[int] = set(os.sched_getaffinity(0)) if self._supported else set()
+        self.control_cpus: Set[int] = set(self.cfg.control_cpus) & self.all_cpus
+        self.inference_cpus: Set[int] = (self.all_cpus - self.control_cpus) or set(self.all_cpus)
+        self._placed: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._cpu_prev: Dict[int, float] = {}
+        self._thread: threading.Thread | None = None
+
+    # -------------------- Placement --------------------
+    def place_current_thread(self, role: str) -> None:
+        """Pin and prioritise the calling thread for a reserved role ("control", "uwb")."""
+        tid = threading.get_native_id()
+        notes: List[str] = []
+        cpus = self.control_cpus or self.all_cpus
+        self._set_affinity(cpus, notes)
+
+        if self.cfg.control_rt_priority > 0 and hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.cfg.control_rt_priority))
+                notes.append(f"SCHED_FIFO {self.cfg.control_rt_priority}")
+            except OSError as e:
+                notes.append(f"SCHED_FIFO denied ({e.strerror})")
+        elif self.cfg.control_nice:
+            try:
+                os.setpriority(os.PRIO_PROCESS, tid, self.cfg.control_nice)
+                notes.append(f"nice {self.cfg.control_nice}")
+            except OSError as e:
+                notes.append(f"nice denied ({e.strerror})")
+
+        self._record(tid, role, cpus, notes)
+
+    def configure_inference(self) -> None:
+        """Pin the calling thread to the inference cores and cap torch's thread pools."""
+        tid = threading.get_native_id()
+        notes: List[str] = []
+        self._set_affinity(self.inference_cpus, notes)
+
+        n = self.cfg.inference_threads or max(1, len(self.inference_cpus))
+        try:
+            import torch
+            torch.set_num_threads(n)
+            notes.append(f"torch threads {n}")
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass   # already initialised; only allowed before the first parallel op
+        except ImportError:
+            notes.append("torch unavailable")
+
+        self._record(tid, "inference", self.inference_cpus, notes)
+
+    def _set_affinity(self, cpus: Set[int], notes: List[str]) -> None:
+        if not self._supported or not cpus:
+            notes.append("affinity unsupported")
+            return
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            notes.append(f"affinity denied ({e.strerror})")
+
+    def _record(self, tid: int, role: str, cpus: Set[int], notes: List[str]) -> None:
+        with self._lock:
+            self._placed[tid] = {"role": role, "cpus": sorted(cpus), "notes": notes}
+        print(f"[PLACE] {role} (tid {tid}) -> cpus {sorted(cpus)} {'; '.join(notes)}")
+
+    # -------------------- Reporting --------------------
+    @staticmethod
+    def _thread_cpu_seconds(tid: int) -> Optional[float]:
+        """utime + stime of one thread from /proc (Linux only)."""
+        try:
+            with open(f"/proc/self/task/{tid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            ticks = int(fields[11]) + int(fields[12])
+            return ticks / os.sysconf("SC_CLK_TCK")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def report(self, interval: Optional[float] = None) -> None:
+        """Print placement and per-thread CPU usage (percent of one core over `interval`)."""
+        names = {t.native_id: t.name for t in threading.enumerate()}
+        try:
+            tids = sorted(int(t) for t in os.listdir("/proc/self/task"))
+        except OSError:
+            tids = sorted(names)
+
+        print(f"[PLACE] cpus={sorted(self.all_cpus)} control={sorted(self.control_cpus)} "
+              f"inference={sorted(self.inference_cpus)}")
+        with self._lock:
+            placed = dict(self._placed)
+        for tid in tids:
+            cpu = self._thread_cpu_seconds(tid)
+            if cpu is None:
+                continue
+            prev = self._cpu_prev.get(tid)
+            self._cpu_prev[tid] = cpu
+            usage = f"{100.0 * (cpu - prev) / interval:5.1f}%" if interval and prev is not None else "  n/a"
+            role = placed.get(tid, {}).get("role", "-")
+            print(f"[PLACE]   tid {tid:<7} {role:<9} {usage}  {names.get(tid, '')}")
+
+    def start_monitor(self, stop_event: threading.Event, daemon: bool = True) -> None:
+        """Print report() every report_period seconds in a background thread."""
+        if self.cfg.report_period <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(
+            target=self._run_loop, args=(stop_event,), daemon=daemon
+        )
+        self._thread.start()
+
+    def _run_loop(self, stop_evt: threading.Event):
+        while not stop_evt.wait(self.cfg.report_period):
+            self.report(self.cfg.report_period)
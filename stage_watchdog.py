@@ -0,0 +1,117 @@
+# Comments in English only
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+
+# ------------ Config ------------
+@dataclass
+class WatchdogConfig:
+    # Maximum allowed seconds between heartbeats (and per-beat duration) for each stage
+    budgets: Dict[str, float] = field(default_factory=lambda: {
+        "uwb": 0.5,
+        "capture": 1.0,
+        "inference": 1.0,
+        "command": 0.25,
+    })
+    period: float = 0.05   # watchdog check interval
+
+
+# ------------ Watchdog ------------
+class Watchdog:
+    """
+    Collects heartbeats from pipeline stages and flags stages that exceed their latency budget.
+    Use:
+        wd = Watchdog(WatchdogConfig(...))
+        wd.add_fallback(lambda stage, age: ...)
+        wd.start(stop_event)
+        wd.beat("capture")                  # stage is alive
+        wd.beat("inference", duration=dt)   # stage is alive and took dt seconds
+        wd.is_stale("uwb") -> bool
+    A stage is only supervised after its first heartbeat, so slow startup is not a violation.
+    """
+
+    def __init__(self, config: Optional[WatchdogConfig] = None):
+        self.cfg = config or WatchdogConfig()
+        self._last_beat: Dict[str, float] = {}
+        self._last_dur: Dict[str, float] = {}
+        self._tripped: Dict[str, bool] = {}
+        self._fallbacks: List[Callable[[str, float], None]] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add_fallback(self, fn: Callable[[str, float], None]) -> None:
+        """Register fn(stage, age) to be called once when a stage exceeds its budget."""
+        self._fallbacks.append(fn)
+
+    def beat(self, stage: str, duration: Optional[float] = None) -> None:
+        """Heartbeat from a stage; optionally report how long the stage just took."""
+        now = time.monotonic()
+        with self._lock:
+            self._last_beat[stage] = now
+            if duration is not None:
+                self._last_dur[stage] = duration
+            was_tripped = self._tripped.get(stage, False)
+            self._tripped[stage] = False
+        if was_tripped:
+            print(f"[WATCHDOG] '{stage}' recovered. {self.timings()}")
+
+        budget = self.cfg.budgets.get(stage)
+        if duration is not None and budget is not None and duration > budget:
+            print(f"[WATCHDOG] '{stage}' took {duration:.3f}s > budget {budget:.3f}s. {self.timings()}")
+
+    def age(self, stage: str) -> Optional[float]:
+        """Seconds since the last heartbeat of a stage, or None if it never reported."""
+        with self._lock:
+            t = self._last_beat.get(stage)
+        return None if t is None else time.monotonic() - t
+
+    def is_stale(self, stage: str) -> bool:
+        """True while a supervised stage is over its budget."""
+        return self._tripped.get(stage, False)
+
+    def timings(self) -> str:
+        """One-line summary of heartbeat ages and last durations for all stages."""
+        now = time.monotonic()
+        with self._lock:
+            parts = []
+            for stage in self.cfg.budgets:
+                t = self._last_beat.get(stage)
+                if t is None:
+                    parts.append(f"{stage}=n/a")
+                    continue
+                d = self._last_dur.get(stage)
+                dur = f"/{d * 1e3:.0f}ms" if d is not None else ""
+                parts.append(f"{stage}={(now - t) * 1e3:.0f}ms{dur}")
+        return "stages: " + " ".join(parts)
+
+    def start(self, stop_event: threading.Event, daemon: bool = True) -> None:
+        """Start the supervision loop in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run_loop, args=(stop_event,), daemon=daemon
+        )
+        self._thread.start()
+
+    # -------------------- Internal loop --------------------
+    def _run_loop(self, stop_evt: threading.Event):
+        while not stop_evt.is_set():
+            for stage, budget in self.cfg.budgets.items():
+                age = self.age(stage)
+                if age is None or age <= budget:
+                    continue
+                with self._lock:
+                    if self._tripped.get(stage, False):
+                        continue
+                    self._tripped[stage] = True
+
+                print(f"[WATCHDOG] '{stage}' stalled {age:.3f}s > budget {budget:.3f}s. {self.timings()}")
+                for fn in self._fallbacks:
+                    try:
+                        fn(stage, age)
+                    except Exception as e:
+                        print(f"[WATCHDOG] Fallback error: {e}")
+
+            stop_evt.wait(self.cfg.period)
@@ -4,17 +4,32 @@ import time
 import cv2
 from ultralytics import YOLO
 from unitree_sdk2py.core.channel import ChannelFactoryInitialize, ChannelSubscriber
-from unitree_sdk2py.idl.unitree_go.msg.dds_ import UwbState_
+from unitree_sdk2py.idl.unitree_go.msg.dds_ import UwbState_, SportModeState_
 from unitree_sdk2py.go2.obstacles_avoid.obstacles_avoid_client import ObstaclesAvoidClient
 from unitree_sdk2py.go2.sport.sport_client import SportClient
 from unitree_sdk2py.go2.video.video_client import VideoClient
 
 from uwb_state_manager import UwbStateManager
 from uwb_button_monitor import UwbButtonMonitor
+from odometry_state import OdometryStateManager
+from visit_memory import VisitMemoryConfig, VisitMemory
+from range_estimator import RangeConfig, RangeEstimator
+from motion_profile import TrapezoidalProfile
 
 from follow_controller import FollowConfig, FollowController
 from camera import Camera
+from webrtc_camera import WebRTCCamera
+from buffer_pool import (
+    AllocationReport, DetectionBuffer, FrameBufferPool, LetterboxBuffer, VisionBuffers,
+)
 from target_lock import TargetLockConfig, TargetLock
+from camera_model import CameraModel
+from latency_compensator import CommandHistory, LatencyConfig, LatencyCompensator
+from stage_watchdog import WatchdogConfig, Watchdog
+from telemetry import TelemetryRecorder
+from resource_placement import PlacementConfig, ResourcePlacement
+from estop import EStopConfig, EmergencyStop
+from profiler import ProfilerConfig, SamplingProfiler
 
 
 class SystemInit:
@@ -25,7 +40,14 @@ class SystemInit:
       - Sport + Obstacle Avoid clients
       - FollowController thread
       - Camera + YOLO model
-      - Target locking
+      - Preallocated frame / letterbox canvas / detection buffers
+      - Target locking + visited-target memory (odometry)
+      - Latency compensation (command history + box prediction)
+      - Approach range estimation + trapezoidal motion profiles
+      - Stage watchdog (latency budgets + fallbacks)
+      - Telemetry recorder
+      - CPU placement (control vs. inference)
+      - On-demand sampling profiler
     """
 
     def __init__(self, config):
@@ -35,41 +57,60 @@ class SystemInit:
         self.cfg = config
 
     # ------------------------------------------------------------
-    # UNITREE (UWB + SPORT + AVOID + BUTTON MONITOR)
+    # UNITREE (UWB + SPORT + AVOID + BUTTON MONITOR + E-STOP)
     # ------------------------------------------------------------
-    def init_unitree(self, behavior):
+    def init_unitree(self, behavior, stop_event, watchdog=None, placement=None, profiler=None):
         print("[INIT] Initializing Unitree SDK...")
 
         ChannelFactoryInitialize(0)
 
+        # Sport + obstacle clients (created first so the e-stop can be pre-bound)
+        sport = SportClient()
+        avoid = ObstaclesAvoidClient()
+        avoid.Init()
+        sport.Init()
+        avoid.UseRemoteCommandFromApi(True)
+        avoid.SwitchSet(True)
+
+        # Emergency stop bound to the live clients; cleanup steps are added by the caller
+        estop = EmergencyStop(
+            avoid, sport, stop_event,
+            EStopConfig(
+                damp=self.cfg.ESTOP_DAMP,
+                step_timeout=self.cfg.ESTOP_STEP_TIMEOUT,
+                total_timeout=self.cfg.ESTOP_TOTAL_TIMEOUT,
+            ),
+            placement=placement,
+        )
+        estop.add_shutdown_step("release API control",
+                                lambda: avoid.UseRemoteCommandFromApi(False), order=90)
+        estop.start()
+
         # UWB / state manager
         state_manager = UwbStateManager()
 
         button_monitor = UwbButtonMonitor(
-            state_manager, 
-            lambda: print("[UWB] Shutdown button pressed.")
+            state_manager,
+            estop.trigger,
+            watchdog=watchdog,
+            placement=placement,
+            combo_mask=self.cfg.PROFILE_BUTTON_MASK if profiler is not None else 0,
+            on_combo_pressed=profiler.request if profiler is not None else None,
         )
 
         uwb_sub = ChannelSubscriber("rt/uwbstate", UwbState_)
         uwb_sub.Init(button_monitor.get_callback(), 10)
 
-        # Sport + obstacle clients
-        sport = SportClient()
-        avoid = ObstaclesAvoidClient()
-        avoid.Init()
-        sport.Init()
-        avoid.UseRemoteCommandFromApi(True)
-        avoid.SwitchSet(True)
-
         print("[INIT] Unitree communication established.")
 
         # Return handles
-        return state_manager, sport, avoid
+        return state_manager, sport, avoid, estop
 
     # ------------------------------------------------------------
     # FOLLOW CONTROLLER THREAD
     # ------------------------------------------------------------
-    def init_follower(self, state_manager, avoid, behavior, stop_event):
+    def init_follower(self, state_manager, avoid, behavior, stop_event,
+                      history=None, watchdog=None, telemetry=None, placement=None):
         print("[INIT] Starting FollowController thread...")
 
         follow_cfg = FollowConfig(
@@ -85,7 +126,9 @@ class SystemInit:
             MAX_WZ_FOLLOW=self.cfg.MAX_WZ_FOLLOW,
         )
 
-        follower = FollowController(state_manager, avoid, behavior, follow_cfg)
+        follower = FollowController(state_manager, avoid, behavior, follow_cfg,
+                                    history=history, watchdog=watchdog, telemetry=telemetry,
+                                    placement=placement)
         follower.start(stop_event, daemon=True)
 
         print("[INIT] FollowController is running.")
@@ -97,7 +140,12 @@ class SystemInit:
     def init_vision(self):
         print("[INIT] Initializing camera...")
 
-        cam = Camera(timeout_sec=self.cfg.CAM_TIMEOUT_SEC)
+        if self.cfg.CAM_BACKEND == "webrtc":
+            # Push-based stream over the shared WebRTC session
+            cam = WebRTCCamera(timeout_sec=self.cfg.CAM_TIMEOUT_SEC, ip=self.cfg.ROBOT_IP)
+        else:
+            # GetImageSample polling (one JPEG per RPC)
+            cam = Camera(timeout_sec=self.cfg.CAM_TIMEOUT_SEC, pool=FrameBufferPool())
 
         print("[INIT] Loading YOLO model...")
         model = YOLO("yolov8n.pt")    # original literal
@@ -109,6 +157,27 @@ class SystemInit:
 
         return cam, model, names
 
+    # ------------------------------------------------------------
+    # BUFFER POOL
+    # ------------------------------------------------------------
+    def init_buffers(self, model, names):
+        print("[INIT] Preallocating vision buffers...")
+
+        target_cls = next((int(k) for k, v in names.items() if v == self.cfg.TARGET_CLASS), None)
+        if target_cls is None:
+            raise ValueError(f"TARGET_CLASS {self.cfg.TARGET_CLASS!r} is not a class of the YOLO model")
+        buffers = VisionBuffers(
+            letterbox=LetterboxBuffer(self.cfg.YOLO_IMGSZ),
+            detections=DetectionBuffer(self.cfg.DET_CAPACITY),
+            candidates=DetectionBuffer(self.cfg.DET_CAPACITY),
+            target_cls=target_cls,
+            alloc=AllocationReport(
+                enabled=self.cfg.ALLOC_REPORT,
+                every=self.cfg.ALLOC_REPORT_EVERY,
+            ),
+        )
+        return buffers
+
     # ------------------------------------------------------------
     # TARGET LOCK
     # ------------------------------------------------------------
@@ -122,3 +191,130 @@ class SystemInit:
         )
         lock = TargetLock(lock_cfg)
         return lock
+
+    # ------------------------------------------------------------
+    # ODOMETRY + VISITED TARGETS
+    # ------------------------------------------------------------
+    def init_visit_memory(self):
+        print("[INIT] Subscribing to odometry for visited-target memory...")
+
+        odom = OdometryStateManager()
+        odom_sub = ChannelSubscriber("rt/sportmodestate", SportModeState_)
+        odom_sub.Init(odom.update_state, 10)
+
+        visits = VisitMemory(VisitMemoryConfig(
+            radius_m=self.cfg.VISIT_RADIUS_M,
+            ttl_sec=self.cfg.VISIT_TTL_SEC,
+        ))
+        return odom, visits
+
+    # ------------------------------------------------------------
+    # LATENCY COMPENSATION
+    # ------------------------------------------------------------
+    def init_latency(self):
+        print("[INIT] Setting up latency compensation...")
+
+        history = CommandHistory()
+        camera_model = CameraModel(
+            hfov_deg=self.cfg.CAM_HFOV_DEG,
+            vfov_deg=self.cfg.CAM_VFOV_DEG,
+        )
+        latency_cfg = LatencyConfig(
+            enabled=self.cfg.LATENCY_COMP,
+            target_height_m=self.cfg.TARGET_HEIGHT_M,
+            max_predict_sec=self.cfg.MAX_PREDICT_SEC,
+        )
+        compensator = LatencyCompensator(history, camera_model, latency_cfg)
+        return history, compensator
+
+    # ------------------------------------------------------------
+    # STAGE WATCHDOG
+    # ------------------------------------------------------------
+    def init_watchdog(self, stop_event, fallback=None):
+        print("[INIT] Starting stage watchdog...")
+
+        wd_cfg = WatchdogConfig(
+            budgets={
+                "uwb": self.cfg.WD_BUDGET_UWB,
+                "capture": self.cfg.WD_BUDGET_CAPTURE,
+                "inference": self.cfg.WD_BUDGET_INFERENCE,
+                "command": self.cfg.WD_BUDGET_COMMAND,
+            },
+            period=self.cfg.WD_PERIOD,
+        )
+        watchdog = Watchdog(wd_cfg)
+        if fallback is not None:
+            watchdog.add_fallback(fallback)
+        watchdog.start(stop_event, daemon=True)
+        return watchdog
+
+    # ------------------------------------------------------------
+    # TELEMETRY
+    # ------------------------------------------------------------
+    def init_telemetry(self):
+        print("[INIT] Starting telemetry recorder...")
+
+        telemetry = TelemetryRecorder(
+            root=self.cfg.TELEMETRY_DIR,
+            enabled=self.cfg.TELEMETRY,
+            segment_rows=self.cfg.TELEMETRY_SEGMENT_ROWS,
+        )
+        telemetry.start()
+        if telemetry.enabled:
+            print(f"[INIT] Telemetry -> {telemetry.directory}")
+        return telemetry
+
+    # ------------------------------------------------------------
+    # CPU PLACEMENT
+    # ------------------------------------------------------------
+    def init_placement(self):
+        print("[INIT] Planning CPU placement...")
+
+        placement_cfg = PlacementConfig(
+            control_cpus=tuple(self.cfg.CONTROL_CPUS),
+            control_nice=self.cfg.CONTROL_NICE,
+            control_rt_priority=self.cfg.CONTROL_RT_PRIORITY,
+            inference_threads=self.cfg.INFERENCE_THREADS,
+            report_period=self.cfg.PLACEMENT_REPORT_SEC,
+        )
+        placement = ResourcePlacement(placement_cfg)
+
+        # Pin the main thread to the inference cores before any helper thread exists,
+        # so every thread spawned later inherits the non-control mask
+        placement.configure_inference()
+        return placement
+
+    # ------------------------------------------------------------
+    # PROFILER
+    # ------------------------------------------------------------
+    def init_profiler(self, stop_event):
+        print("[INIT] Arming on-demand profiler...")
+
+        profiler = SamplingProfiler(ProfilerConfig(
+            duration=self.cfg.PROFILE_SECONDS,
+            interval=self.cfg.PROFILE_INTERVAL,
+            out_dir=self.cfg.PROFILE_DIR,
+        ))
+        profiler.start(stop_event, daemon=True)
+        if profiler.install_signal():
+            print("[INIT] Profiler: send SIGUSR1 to capture.")
+        return profiler
+
+    # ------------------------------------------------------------
+    # APPROACH (RANGE + MOTION PROFILES)
+    # ------------------------------------------------------------
+    def init_approach(self, camera_model):
+        print("[INIT] Setting up approach range estimator and motion profiles...")
+
+        ranger = RangeEstimator(camera_model, RangeConfig(
+            class_heights_m=dict(self.cfg.CLASS_HEIGHTS_M),
+            default_height_m=self.cfg.TARGET_HEIGHT_M,
+            fuse_uwb=self.cfg.RANGE_FUSE_UWB,
+            uwb_weight=self.cfg.RANGE_UWB_WEIGHT,
+        ))
+        vx_profile = TrapezoidalProfile(
+            self.cfg.MAX_VX, self.cfg.APPROACH_ACC, self.cfg.APPROACH_DEC,
+            max_v_back=self.cfg.MAX_VX_BACK,
+        )
+        wz_profile = TrapezoidalProfile(self.cfg.MAX_WZ, self.cfg.APPROACH_WZ_ACC)
+        return ranger, vx_profile, wz_profile
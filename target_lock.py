@@ -1,11 +1,15 @@
 # Comments in English only
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional, Union
+
+import numpy as np
 
 
 # ------------ Types ------------
 # candidate: (confidence, (x1,y1,x2,y2)) in pixel coordinates
 Candidate = Tuple[float, Tuple[float, float, float, float]]
+# candidates may also be a structured array with fields conf, x1, y1, x2, y2 (see buffer_pool.DET_DTYPE)
+Candidates = Union[List[Candidate], np.ndarray]
 
 
 # ------------ Config ------------
@@ -30,13 +34,28 @@ def iou(ax1: float, ay1: float, ax2: float, ay2: float,
     return (inter / denom) if denom > 0.0 else 0.0
 
 
+def iou_many(ax1: float, ay1: float, ax2: float, ay2: float, dets: np.ndarray) -> np.ndarray:
+    """IoU between one box and every row of a structured detection array."""
+    iw = np.clip(np.minimum(ax2, dets["x2"]) - np.maximum(ax1, dets["x1"]), 0.0, None)
+    ih = np.clip(np.minimum(ay2, dets["y2"]) - np.maximum(ay1, dets["y1"]), 0.0, None)
+    inter = iw * ih
+    a = max(0.0, ax2 - ax1) * max(0.0, ay2 - ay1)
+    b = np.clip(dets["x2"] - dets["x1"], 0.0, None) * np.clip(dets["y2"] - dets["y1"], 0.0, None)
+    denom = a + b - inter
+    return np.where(denom > 0.0, inter / np.maximum(denom, 1e-9), 0.0)
+
+
+def _row_box(row) -> Tuple[float, float, float, float]:
+    return (float(row["x1"]), float(row["y1"]), float(row["x2"]), float(row["y2"]))
+
+
 # ------------ Target Lock ------------
 class TargetLock:
     """
     Tracks a single target box across frames using IoU association.
     Use:
         lock = TargetLock(TargetLockConfig(...))
-        lock.acquire(candidates, roi_rect=(rx1, ry1, rx2, ry2))
+        lock.acquire(candidates, roi_rect=(rx1, ry1, rx2, ry2), exclude=None)
         lock.update(candidates)
         lock.box -> current (x1,y1,x2,y2) or None
         lock.active -> bool
@@ -53,12 +72,27 @@ class TargetLock:
         self.miss = 0
         self.active = False
 
-    def acquire(self, candidates: List[Candidate],
-                roi_rect: Optional[Tuple[int, int, int, int]] = None) -> bool:
-        """Pick best candidate by confidence (optionally preferring inside-ROI)."""
-        if not candidates:
+    def acquire(self, candidates: Candidates,
+                roi_rect: Optional[Tuple[int, int, int, int]] = None,
+                exclude: Optional[Callable[[Tuple[float, float, float, float]], bool]] = None) -> bool:
+        """
+        Pick best candidate by confidence (optionally preferring inside-ROI).
+        Candidates whose box makes exclude(box) true (e.g. already visited) are skipped.
+        """
+        if exclude is not None and len(candidates) > 0:
+            if isinstance(candidates, np.ndarray):
+                keep = np.fromiter((not exclude(_row_box(r)) for r in candidates),
+                                   dtype=bool, count=len(candidates))
+                candidates = candidates[keep]
+            else:
+                candidates = [c for c in candidates if not exclude(c[1])]
+
+        if len(candidates) == 0:
             return False
 
+        if isinstance(candidates, np.ndarray):
+            return self._acquire_array(candidates, roi_rect)
+
         pool = candidates
         if roi_rect and self.cfg.prefer_roi:
             rx1, ry1, rx2, ry2 = roi_rect
@@ -76,12 +110,12 @@ class TargetLock:
         self.active = True
         return True
 
-    def update(self, candidates: List[Candidate]) -> bool:
+    def update(self, candidates: Candidates) -> bool:
         """Associate by highest IoU with last box; enforce miss budget."""
         if not self.active or self.box is None:
             return False
 
-        if not candidates:
+        if len(candidates) == 0:
             self.miss += 1
             if self.miss > self.cfg.lock_max_miss_fr:
                 self.reset()
@@ -89,10 +123,15 @@ class TargetLock:
 
         bx1, by1, bx2, by2 = self.box
         best_iou, best_box = -1.0, None
-        for _, (x1, y1, x2, y2) in candidates:
-            ov = iou(bx1, by1, bx2, by2, x1, y1, x2, y2)
-            if ov > best_iou:
-                best_iou, best_box = ov, (x1, y1, x2, y2)
+        if isinstance(candidates, np.ndarray):
+            ovs = iou_many(bx1, by1, bx2, by2, candidates)
+            i = int(np.argmax(ovs))
+            best_iou, best_box = float(ovs[i]), _row_box(candidates[i])
+        else:
+            for _, (x1, y1, x2, y2) in candidates:
+                ov = iou(bx1, by1, bx2, by2, x1, y1, x2, y2)
+                if ov > best_iou:
+                    best_iou, best_box = ov, (x1, y1, x2, y2)
 
         if best_iou >= self.cfg.lock_iou_min:
             self.box = best_box
@@ -103,3 +142,20 @@ class TargetLock:
                 self.reset()
 
         return self.active
+
+    def _acquire_array(self, dets: np.ndarray,
+                       roi_rect: Optional[Tuple[int, int, int, int]]) -> bool:
+        """acquire() for a structured detection array."""
+        conf = dets["conf"]
+        if roi_rect and self.cfg.prefer_roi:
+            rx1, ry1, rx2, ry2 = roi_rect
+            cx = 0.5 * (dets["x1"] + dets["x2"])
+            cy = 0.5 * (dets["y1"] + dets["y2"])
+            in_roi = (cx >= rx1) & (cx <= rx2) & (cy >= ry1) & (cy <= ry2)
+            if in_roi.any():
+                conf = np.where(in_roi, conf, -np.inf)
+
+        self.box = _row_box(dets[int(np.argmax(conf))])
+        self.miss = 0
+        self.active = True
+        return True
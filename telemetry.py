@@ -0,0 +1,228 @@
+# Comments in English only
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# ------------ Record layouts ------------
+MODES = ("FOLLOW", "APPROACH", "HOLD")
+MODE_CODE = {m: i for i, m in enumerate(MODES)}
+NAN = math.nan
+
+# One row per vision frame (times in ms, box in frame pixels, NaN when absent)
+FRAME_DTYPE = np.dtype([
+    ("t", np.float64),            # time.monotonic()
+    ("mode", np.uint8),
+    ("vx", np.float32),
+    ("wz", np.float32),
+    ("x1", np.float32),
+    ("y1", np.float32),
+    ("x2", np.float32),
+    ("y2", np.float32),
+    ("uwb_dist", np.float32),
+    ("uwb_ori", np.float32),
+    ("capture_ms", np.float32),
+    ("inference_ms", np.float32),
+    ("loop_ms", np.float32),
+    ("delay_ms", np.float32),
+    ("n_det", np.uint16),
+    ("range_m", np.float32),
+])
+
+# One row per FollowController cycle
+CONTROL_DTYPE = np.dtype([
+    ("t", np.float64),
+    ("mode", np.uint8),
+    ("vx", np.float32),
+    ("wz", np.float32),
+    ("uwb_dist", np.float32),
+    ("uwb_ori", np.float32),
+    ("move_ms", np.float32),
+    ("error", np.uint8),
+])
+
+STREAMS = {"frames": FRAME_DTYPE, "control": CONTROL_DTYPE}
+
+
+# ------------ Writer side ------------
+class _Stream:
+    """Append-only sequence of fixed-size .npy segments backed by memory maps."""
+
+    def __init__(self, directory: str, name: str, dtype: np.dtype, segment_rows: int,
+                 queue_rows: int):
+        self.directory = directory
+        self.name = name
+        self.dtype = dtype
+        self.segment_rows = segment_rows
+        self.queue: Deque[tuple] = deque(maxlen=queue_rows)
+        self.dropped = 0
+        self.segments: List[str] = []
+        self.counts: List[int] = []
+        self._mm: Optional[np.memmap] = None
+
+    def _open_segment(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+        fname = f"{self.name}_{len(self.segments):04d}.npy"
+        self._mm = np.lib.format.open_memmap(
+            os.path.join(self.directory, fname), mode="w+",
+            dtype=self.dtype, shape=(self.segment_rows,),
+        )
+        self.segments.append(fname)
+        self.counts.append(0)
+
+    def drain(self) -> int:
+        n = 0
+        while self.queue:
+            row = self.queue.popleft()
+            if self._mm is None or self.counts[-1] >= self.segment_rows:
+                self._open_segment()
+            self._mm[self.counts[-1]] = row
+            self.counts[-1] += 1
+            n += 1
+        return n
+
+    def flush(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+
+    def meta(self) -> dict:
+        return {
+            "dtype": self.dtype.descr,
+            "segments": self.segments,
+            "counts": self.counts,
+            "dropped": self.dropped,
+        }
+
+
+class TelemetryRecorder:
+    """
+    Full-rate structured telemetry with near-zero cost on the hot path.
+    record_frame()/record_control() only append a tuple to a bounded in-memory queue;
+    a background writer copies rows into memory-mapped .npy segments and keeps a
+    meta.json (segment list + valid row counts) up to date. Load with load_session().
+    Use:
+        tel = TelemetryRecorder("telemetry")
+        tel.start()
+        tel.record_frame(...)
+        tel.close()
+    """
+
+    def __init__(self, root: str = "telemetry", enabled: bool = True,
+                 segment_rows: int = 65536, queue_rows: int = 8192,
+                 flush_period: float = 0.5):
+        self.enabled = enabled
+        self.flush_period = flush_period
+        self.directory = os.path.join(root, time.strftime("session_%Y%m%d_%H%M%S"))
+        self._streams: Dict[str, _Stream] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()   # serializes _write_out() and close()
+        self._closed = False
+        if enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            for name, dtype in STREAMS.items():
+                self._streams[name] = _Stream(self.directory, name, dtype, segment_rows, queue_rows)
+
+    # -------------------- Hot path --------------------
+    def _push(self, stream: str, row: tuple) -> None:
+        s = self._streams[stream]
+        if len(s.queue) == s.queue.maxlen:
+            s.dropped += 1
+        s.queue.append(row)
+
+    def record_frame(self, t: float, mode: str, vx: float, wz: float,
+                     box: Optional[Tuple[float, float, float, float]],
+                     uwb_dist: Optional[float], uwb_ori: Optional[float],
+                     capture_ms: float, inference_ms: float, loop_ms: float,
+                     delay_ms: float = NAN, n_det: int = 0, range_m: float = NAN) -> None:
+        if not self.enabled:
+            return
+        x1, y1, x2, y2 = box if box is not None else (NAN, NAN, NAN, NAN)
+        self._push("frames", (
+            t, MODE_CODE.get(mode, 255), vx, wz, x1, y1, x2, y2,
+            NAN if uwb_dist is None else uwb_dist, NAN if uwb_ori is None else uwb_ori,
+            capture_ms, inference_ms, loop_ms, delay_ms, n_det, range_m,
+        ))
+
+    def record_control(self, t: float, mode: str, vx: float, wz: float,
+                       uwb_dist: Optional[float], uwb_ori: Optional[float],
+                       move_ms: float, error: bool = False) -> None:
+        if not self.enabled:
+            return
+        self._push("control", (
+            t, MODE_CODE.get(mode, 255), vx, wz,
+            NAN if uwb_dist is None else uwb_dist, NAN if uwb_ori is None else uwb_ori,
+            move_ms, int(error),
+        ))
+
+    # -------------------- Writer --------------------
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop the writer, drain pending rows and finalize meta.json (idempotent, thread-safe)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._write_out()
+
+    def _run_loop(self):
+        while not self._stop.wait(self.flush_period):
+            self._write_out()
+
+    def _write_out(self) -> None:
+        with self._lock:
+            self._write_out_locked()
+
+    def _write_out_locked(self) -> None:
+        try:
+            for s in self._streams.values():
+                s.drain()
+                s.flush()
+            meta = {name: s.meta() for name, s in self._streams.items()}
+            tmp = os.path.join(self.directory, "meta.json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(self.directory, "meta.json"))
+        except Exception as e:
+            print(f"[TELEMETRY] Write error: {e}")
+
+
+# ------------ Reader side ------------
+def load_stream(session_dir: str, stream: str = "frames") -> np.ndarray:
+    """Load the valid rows of one stream as a structured array."""
+    with open(os.path.join(session_dir, "meta.json")) as f:
+        meta = json.load(f)[stream]
+    parts = []
+    for fname, count in zip(meta["segments"], meta["counts"]):
+        seg = np.load(os.path.join(session_dir, fname), mmap_mode="r")
+        parts.append(np.asarray(seg[:count]))
+    if not parts:
+        return np.zeros(0, dtype=STREAMS[stream])
+    return np.concatenate(parts)
+
+
+def load_session(session_dir: str, stream: str = "frames"):
+    """Load one stream of a recorded session into a pandas DataFrame (pandas required)."""
+    import pandas as pd
+
+    df = pd.DataFrame(load_stream(session_dir, stream))
+    df["mode"] = df["mode"].map(dict(enumerate(MODES))).astype("category")
+    return df
@@ -0,0 +1,82 @@
+# Comments in English only
+"""Loopback test: two in-process peers stream a synthetic track into WebRTCCamera.consume()."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("av")
+aiortc = pytest.importorskip("aiortc")
+
+from aiortc import RTCPeerConnection, VideoStreamTrack  # noqa: E402
+
+from webrtc_camera import WebRTCCamera  # noqa: E402
+
+
+async def _connect(cam):
+    """Negotiate pc1 (sender) -> pc2 (receiver) and feed pc2's track into the camera."""
+    pc1, pc2 = RTCPeerConnection(), RTCPeerConnection()
+
+    @pc2.on("track")
+    def on_track(track):
+        asyncio.ensure_future(cam.consume(track))
+
+    pc1.addTrack(VideoStreamTrack())
+    await pc1.setLocalDescription(await pc1.createOffer())
+    await pc2.setRemoteDescription(pc1.localDescription)
+    await pc2.setLocalDescription(await pc2.createAnswer())
+    await pc1.setRemoteDescription(pc2.localDescription)
+    return pc1, pc2
+
+
+@pytest.fixture
+def loopback_camera():
+    # The peers live on their own loop thread, like the shared WebRTC session,
+    # so the blocking reader can run on the test thread
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    cam = WebRTCCamera(timeout_sec=10.0, attach=False)
+    pc1, pc2 = asyncio.run_coroutine_threadsafe(_connect(cam), loop).result(timeout=10)
+    try:
+        yield cam
+    finally:
+        cam.close()
+        for pc in (pc1, pc2):
+            asyncio.run_coroutine_threadsafe(pc.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+def test_returns_fresh_bgr_frames(loopback_camera):
+    cam = loopback_camera
+    img1, t1 = cam.get_frame_stamped()
+    img2, t2 = cam.get_frame_stamped()
+
+    for img in (img1, img2):
+        assert isinstance(img, np.ndarray)
+        assert img.dtype == np.uint8
+        assert img.ndim == 3 and img.shape[2] == 3
+    assert t2 > t1
+    assert t2 <= time.monotonic()
+
+
+def test_counts_dropped_frames_when_not_read(loopback_camera):
+    cam = loopback_camera
+    img, _ = cam.get_frame_stamped()
+    assert img is not None
+
+    before = cam.dropped
+    time.sleep(0.5)          # ~15 frames at the synthetic track's 30 fps
+    img, _ = cam.get_frame_stamped()
+    assert img is not None
+    assert cam.dropped > before
+
+
+def test_times_out_after_close(loopback_camera):
+    cam = loopback_camera
+    cam.close()
+    assert cam.get_frame_stamped() == (None, None)
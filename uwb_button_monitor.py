@@ -1,35 +1,54 @@
-import threading
 import time
-import os
 from unitree_sdk2py.idl.unitree_go.msg.dds_ import UwbState_
 
 class UwbButtonMonitor:
-    def __init__(self, state_manager, on_x_pressed_callback):
+    """
+    DDS callback for rt/uwbstate: updates the state manager and watches the buttons.
+    on_x_pressed_callback(t_press) is called synchronously in the DDS thread, with the
+    time.monotonic() receipt time of the message, so the stop path has no thread hop.
+    on_combo_pressed() is called when all bits of combo_mask become pressed (0 disables).
+    """
+
+    def __init__(self, state_manager, on_x_pressed_callback, watchdog=None, placement=None,
+                 combo_mask=0, on_combo_pressed=None):
         self.state_manager = state_manager
         self.on_x_pressed_callback = on_x_pressed_callback
+        self.combo_mask = combo_mask
+        self.on_combo_pressed = on_combo_pressed
+        self.watchdog = watchdog
+        self.placement = placement
+        self._placed = False
         self.last_buttons_state = 0
 
     def get_callback(self):
         def uwb_callback(msg: UwbState_):
-            self.state_manager.update_state(msg)
+            t_rx = time.monotonic()
             current_buttons = msg.buttons
             changed = current_buttons ^ self.last_buttons_state
-            if changed == 0:
-                return
 
             BUTTON_X_MASK = 1 << 2  # X button = bit 2
 
-            if changed & BUTTON_X_MASK:
-                if current_buttons & BUTTON_X_MASK:
-                    print("[UWB] X button pressed — initiating shutdown.")
-
-                    def shutdown():
-                        self.on_x_pressed_callback()
-                        time.sleep(0.1)
-                        os._exit(0)
+            # Emergency stop first: nothing else runs before the stop command
+            if changed & BUTTON_X_MASK and current_buttons & BUTTON_X_MASK:
+                self.on_x_pressed_callback(t_rx)
+                print("[UWB] X button pressed — emergency stop.")
 
+            # Pin the DDS receive thread on its first delivery
+            if self.placement is not None and not self._placed:
+                self._placed = True
+                self.placement.place_current_thread("uwb")
+            self.state_manager.update_state(msg)
+            if self.watchdog is not None:
+                self.watchdog.beat("uwb")
+            if changed == 0:
+                return
 
-                    threading.Thread(target=shutdown, daemon=True).start()
+            # Button combination (e.g. profiler trigger): fire on the press that completes it
+            mask = self.combo_mask
+            if (mask and self.on_combo_pressed is not None
+                    and current_buttons & mask == mask
+                    and self.last_buttons_state & mask != mask):
+                self.on_combo_pressed()
 
             self.last_buttons_state = current_buttons
 
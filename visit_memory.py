@@ -0,0 +1,77 @@
+# Comments in English only
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from camera_model import CameraModel
+
+Box = Tuple[float, float, float, float]
+Pose = Tuple[float, float, float]   # (x, y, yaw) in the odometry frame
+
+
+# ------------ Config ------------
+@dataclass
+class VisitMemoryConfig:
+    radius_m: float = 0.8       # candidates projecting within this distance count as visited
+    ttl_sec: float = 600.0      # entries expire after this long
+    cell_m: float = 1.0         # grid cell size of the spatial index
+
+
+# ------------ Geometry ------------
+def target_world_position(box: Box, frame_w: int, frame_h: int, pose: Pose,
+                          camera: CameraModel, object_h: float,
+                          cam_offset_x: float = 0.0) -> Tuple[float, float]:
+    """Project a box to odometry-frame (x, y) using its bearing and the range implied by its height."""
+    x1, y1, x2, y2 = box
+    bearing = camera.bearing(0.5 * (x1 + x2), frame_w)
+    rng = camera.range_from_height(y2 - y1, frame_h, object_h)
+    px, py, yaw = pose
+    cx = px + cam_offset_x * math.cos(yaw)
+    cy = py + cam_offset_x * math.sin(yaw)
+    return cx + rng * math.cos(yaw + bearing), cy + rng * math.sin(yaw + bearing)
+
+
+# ------------ Spatial memory ------------
+class VisitMemory:
+    """
+    Positions of already-reached targets in a uniform grid with per-entry expiry.
+    Use:
+        mem = VisitMemory(VisitMemoryConfig(...))
+        mem.add(x, y)
+        mem.is_visited(x, y) -> bool
+    """
+
+    def __init__(self, config: Optional[VisitMemoryConfig] = None):
+        self.cfg = config or VisitMemoryConfig()
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, float]]] = {}
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (math.floor(x / self.cfg.cell_m), math.floor(y / self.cfg.cell_m))
+
+    def add(self, x: float, y: float, now: Optional[float] = None) -> None:
+        t = time.monotonic() if now is None else now
+        self._cells.setdefault(self._cell(x, y), []).append((x, y, t + self.cfg.ttl_sec))
+
+    def is_visited(self, x: float, y: float, now: Optional[float] = None) -> bool:
+        t = time.monotonic() if now is None else now
+        r = self.cfg.radius_m
+        span = int(math.ceil(r / self.cfg.cell_m))
+        ci, cj = self._cell(x, y)
+        for i in range(ci - span, ci + span + 1):
+            for j in range(cj - span, cj + span + 1):
+                entries = self._cells.get((i, j))
+                if not entries:
+                    continue
+                # Drop expired entries lazily
+                entries[:] = [e for e in entries if e[2] > t]
+                if not entries:
+                    del self._cells[(i, j)]
+                    continue
+                for ex, ey, _ in entries:
+                    if (ex - x) ** 2 + (ey - y) ** 2 <= r * r:
+                        return True
+        return False
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._cells.values())
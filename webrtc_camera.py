@@ -0,0 +1,115 @@
+# Comments in English only
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from aiortc.mediastreams import MediaStreamError
+
+
+class WebRTCCamera:
+    """
+    Camera-compatible backend fed by the robot's WebRTC video stream (push, not polling).
+    - Frames are received on the shared WebRTC session loop and kept in a latest-frame slot
+      (older unread frames are dropped and counted in self.dropped).
+    - get_frame() / get_frame_stamped() return the newest frame not yet returned, waiting up
+      to timeout_sec for one.
+    - The stamp is the time.monotonic() arrival time of the decoded frame, not the sensor
+      exposure time: it excludes the robot's encode, network and decode latency. The RTP
+      pts runs on the robot's clock with an unknown offset, so it cannot stand in for it;
+      latency compensation therefore under-predicts by that upstream delay.
+    - The YUV -> BGR conversion happens in the reader, so frames that are dropped cost nothing.
+    - consume(track) accepts any aiortc video track, e.g. from a local loopback peer:
+          cam = WebRTCCamera(attach=False)
+          loop.create_task(cam.consume(track))
+    """
+
+    def __init__(self, timeout_sec: float = 2.0, session=None, ip: Optional[str] = None,
+                 attach: bool = True):
+        self._timeout = timeout_sec
+        self._cond = threading.Condition()
+        self._frame = None       # latest av.VideoFrame
+        self._stamp = None
+        self._seq = 0
+        self._read_seq = 0
+        self._closed = False
+        self.dropped = 0
+
+        self.session = session
+        if attach:
+            # Imported here so consume() works without the Go2 driver (e.g. loopback tests)
+            from webrtc_session import DEFAULT_IP, get_session
+
+            self.session = session or get_session(ip or DEFAULT_IP)
+            self.session.add_listener(self._attach)
+
+    def _attach(self, conn):
+        """Enable the robot video channel on a fresh connection and subscribe to its track."""
+        conn.video.switchVideoChannel(True)
+        conn.video.add_track_callback(self.consume)
+        print("[CAM] WebRTC video subscribed.")
+
+    async def consume(self, track):
+        """Receive frames from a video track into the latest-frame slot until closed."""
+        while not self._closed:
+            try:
+                frame = await track.recv()
+            except (MediaStreamError, asyncio.CancelledError):
+                break
+            t = time.monotonic()
+            with self._cond:
+                if self._seq != self._read_seq:
+                    self.dropped += 1
+                self._frame = frame
+                self._stamp = t
+                self._seq += 1
+                self._cond.notify_all()
+
+    def get_frame(self):
+        """Newest BGR frame, or None if none arrived within the timeout."""
+        img, _ = self.get_frame_stamped()
+        return img
+
+    def get_frame_stamped(self):
+        """
+        Newest (BGR frame, arrival time) not returned before, or (None, None) on timeout.
+        The time is local arrival (time.monotonic()), later than the actual capture by the
+        robot-side encode + network + decode delay.
+        """
+        with self._cond:
+            fresh = self._cond.wait_for(
+                lambda: self._closed or self._seq != self._read_seq, timeout=self._timeout
+            )
+            if not fresh or self._closed or self._frame is None:
+                return None, None
+            frame, stamp = self._frame, self._stamp
+            self._read_seq = self._seq
+
+        try:
+            img = frame.to_ndarray(format="bgr24")
+        except Exception as e:
+            print(f"[CAM] Decode error: {e}")
+            return None, None
+        return img, stamp
+
+    def close(self):
+        """Stop delivering frames and switch the robot video channel off (idempotent)."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        conn = getattr(self.session, "conn", None)
+        if conn is not None:
+            try:
+                self.session.call_soon(conn.video.switchVideoChannel, False)
+            except Exception:
+                pass
+
+    # -------- Context manager helpers --------
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
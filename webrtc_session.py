@@ -0,0 +1,147 @@
+# Comments in English only
+import asyncio
+import inspect
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from go2_webrtc_driver.webrtc_driver import Go2WebRTCConnection, WebRTCConnectionMethod
+
+DEFAULT_IP = "192.168.123.161"
+
+
+class WebRTCSession:
+    """
+    One Go2 WebRTC connection per robot IP, shared by every audio/video user in the process.
+    - Runs its own asyncio loop in a daemon thread (self.loop).
+    - Supervises the peer connection and reconnects with exponential backoff.
+    - add_listener(fn) registers fn(conn) (sync or async) to run after every (re)connect,
+      so users can re-attach tracks / hubs to the fresh connection.
+    Use get_session(ip) instead of constructing it directly.
+    """
+
+    _instances: Dict[str, "WebRTCSession"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, ip: str = DEFAULT_IP, backoff_initial: float = 0.5,
+                 backoff_max: float = 10.0, check_period: float = 1.0):
+        self.ip = ip
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.check_period = check_period
+        self.loop = asyncio.new_event_loop()
+        self.conn: Optional[Go2WebRTCConnection] = None
+        self._listeners: List[Callable[[Any], Any]] = []
+        self._connected = threading.Event()
+        self._lock = threading.Lock()   # guards _listeners together with _connected
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @classmethod
+    def get(cls, ip: str = DEFAULT_IP, **kwargs) -> "WebRTCSession":
+        """Return the started process-wide session for ip, creating it on first use."""
+        with cls._instances_lock:
+            session = cls._instances.get(ip)
+            if session is None:
+                session = cls(ip, **kwargs)
+                cls._instances[ip] = session
+                session._thread.start()
+            return session
+
+    # -------------------- Public API --------------------
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        return self._connected.wait(timeout)
+
+    def add_listener(self, fn: Callable[[Any], Any]) -> None:
+        """Run fn(conn) after every (re)connect; runs immediately if already connected."""
+        with self._lock:
+            self._listeners.append(fn)
+            connected = self._connected.is_set()
+        if connected:
+            asyncio.run_coroutine_threadsafe(self._notify(fn, self.conn), self.loop)
+
+    def submit(self, coro):
+        """Schedule a coroutine on the session loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, fn: Callable, *args) -> None:
+        """Run a plain callable on the session loop (thread-safe)."""
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Disconnect and stop the loop (idempotent)."""
+        if self._closing:
+            return
+        self._closing = True
+        if self.loop.is_running():
+            try:
+                self.submit(self._disconnect()).result(timeout=timeout)
+            except Exception:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        with self._instances_lock:
+            self._instances.pop(self.ip, None)
+
+    # -------------------- Internal --------------------
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.create_task(self._supervise())
+        self.loop.run_forever()
+
+    def _alive(self) -> bool:
+        pc = getattr(self.conn, "pc", None)
+        return pc is not None and pc.connectionState not in ("failed", "closed")
+
+    async def _supervise(self):
+        delay = self.backoff_initial
+        while not self._closing:
+            if self._alive():
+                await asyncio.sleep(self.check_period)
+                continue
+
+            with self._lock:
+                self._connected.clear()
+            try:
+                await self._disconnect()
+                print(f"[WEBRTC] Connecting to {self.ip}...")
+                conn = Go2WebRTCConnection(WebRTCConnectionMethod.LocalSTA, ip=self.ip)
+                await conn.connect()
+                self.conn = conn
+            except Exception as e:
+                print(f"[WEBRTC] Connection failed: {e} (retry in {delay:.1f}s)")
+                await asyncio.sleep(delay)
+                delay = min(2.0 * delay, self.backoff_max)
+                continue
+
+            delay = self.backoff_initial
+            print("[WEBRTC] Connected.")
+            # Listeners added after this point see connected=True and notify themselves
+            with self._lock:
+                self._connected.set()
+                listeners = list(self._listeners)
+            for fn in listeners:
+                await self._notify(fn, self.conn)
+
+    async def _notify(self, fn: Callable[[Any], Any], conn) -> None:
+        try:
+            out = fn(conn)
+            if inspect.isawaitable(out):
+                await out
+        except Exception as e:
+            print(f"[WEBRTC] Listener error: {e}")
+
+    async def _disconnect(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                await conn.disconnect()
+            except Exception:
+                pass
+
+
+def get_session(ip: str = DEFAULT_IP, **kwargs) -> WebRTCSession:
+    """Shortcut for WebRTCSession.get()."""
+    return WebRTCSession.get(ip, **kwargs)
@@ -1,5 +1,6 @@
 import signal
 import time
+import math
 import threading
 import cv2
 from concurrent.futures import ThreadPoolExecutor
@@ -9,45 +10,34 @@ import asyncio
 # Project imports
 from AppConfig import AppConfig
 from system_init import SystemInit
+from visit_memory import target_world_position
 
 logger = logging.getLogger(__name__)
 
 # -------------------- Globals --------------------
 audio_hub = None
-audio_loop = None # New global to hold the background event loop
+audio_session = None # Shared WebRTC session (owns the background event loop)
+bark_future = None   # Pending bark (concurrent.futures.Future) on the audio loop
+sport_client = None  # Initialised SportClient, used by the watchdog's command fallback
 
 def start_audio_service():
     """
-    Runs in a separate thread. Initializes the connection and keeps 
-    the event loop running forever so the connection doesn't drop.
+    Attaches the audio hub to the process-wide WebRTC session.
+    The session keeps its own event loop running and re-creates the hub after reconnects.
     """
-    global audio_hub, audio_loop
-    
+    global audio_session
+
     # Imports specific to this scope
-    from go2_webrtc_driver.webrtc_driver import Go2WebRTCConnection, WebRTCConnectionMethod
     from go2_webrtc_driver.webrtc_audiohub import WebRTCAudioHub
-    
-    # Create a new event loop for this thread
-    audio_loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(audio_loop)
-    
-    # specific IP for Go2
-    conn = Go2WebRTCConnection(WebRTCConnectionMethod.LocalSTA, ip="192.168.123.161")
+    from webrtc_session import get_session
 
-    try:
-        # Connect and initialize
-        audio_loop.run_until_complete(conn.connect())
+    def on_connected(conn):
+        global audio_hub
         audio_hub = WebRTCAudioHub(conn, logger)
         print("[AUDIO] Service started and connected.")
-        
-        # Keep this loop running indefinitely to handle audio tasks
-        audio_loop.run_forever()
-    except Exception as e:
-        print(f"[AUDIO] Error in audio thread: {e}")
-    finally:
-        # cleanup if loop stops
-        if conn:
-            audio_loop.run_until_complete(conn.disconnect())
+
+    audio_session = get_session(AppConfig.ROBOT_IP)
+    audio_session.add_listener(on_connected)
 
 stop_event = threading.Event()
 
@@ -62,26 +52,58 @@ behavior = {
 }
 
 # -------------------- Utilities --------------------
+def watchdog_fallback(stage, age):
+    """
+    Called from the watchdog thread when a stage exceeds its budget.
+    Vision-driven motion is never replayed blindly: APPROACH drops back to FOLLOW
+    and any visually commanded velocity is zeroed. Stale UWB is gated in FollowController.
+    A stalled command stage (avoid.Move hanging) is stopped through the sport client instead,
+    on its own thread so a hung SDK call cannot block the watchdog.
+    """
+    if stage == "command":
+        behavior["vx"] = 0.0
+        behavior["wz"] = 0.0
+        if behavior["mode"] == "APPROACH":
+            behavior["mode"] = "FOLLOW"
+            behavior["target_box"] = None
+        if sport_client is not None:
+            threading.Thread(target=_stop_sport, daemon=True).start()
+            print("[WATCHDOG] 'command' stalled — StopMove() via sport client")
+    elif stage in ("capture", "inference"):
+        behavior["vx"] = 0.0
+        behavior["wz"] = 0.0
+        if behavior["mode"] == "APPROACH":
+            behavior["mode"] = "FOLLOW"
+            behavior["target_box"] = None
+            print(f"[WATCHDOG] '{stage}' stalled — APPROACH → FOLLOW")
+
+def _stop_sport():
+    try:
+        sport_client.StopMove()
+    except Exception as e:
+        print(f"[WATCHDOG] StopMove error: {e}")
+
 def handle_sigint(signum, frame):
     print("\n[SYS] Ctrl+C detected — stopping...")
     stop_event.set()
     
-    # Gracefully stop the audio loop
-    global audio_loop
-    if audio_loop and audio_loop.is_running():
-        # Schedule the loop to stop from a thread-safe context
-        audio_loop.call_soon_threadsafe(audio_loop.stop)
+    # Gracefully close the shared audio session
+    if audio_session is not None:
+        threading.Thread(target=audio_session.close, daemon=True).start()
 
 def bark():
     """
-    Thread-safe bark function. 
-    Sends the play command to the background audio thread.
+    Thread-safe, non-blocking bark function.
+    Submits the play command to the shared audio loop and returns immediately, so the
+    vision loop never stalls in HOLD. A new bark is skipped while the previous one runs.
     """
-    global audio_hub, audio_loop
-    
-    if audio_hub is None or audio_loop is None:
+    global bark_future
+
+    if audio_hub is None or audio_session is None:
         print("[AUDIO] Audio system not ready yet.")
         return
+    if bark_future is not None and not bark_future.done():
+        return
 
     # The coroutine we want to run
     async def play_coro():
@@ -91,26 +113,35 @@ def bark():
         await asyncio.wait_for(task, timeout=2.0)
         return "Done"
 
-    try:    
-        # Submit the work to the background thread
-        future = asyncio.run_coroutine_threadsafe(play_coro(), audio_loop)
-        
-        # Wait for the result on the main thread (blocking for max 3 seconds)
-        # This 3.0 allows for the 2.0s audio timeout + 1.0s buffer
-        result = future.result(timeout=3.0) 
-        # print(f"[AUDIO] Result: {result}") # Optional: debug print
-        
-    except (asyncio.TimeoutError, TimeoutError):
-        # This catches if the main thread waited too long for the background thread
-        print(f"[AUDIO] Timeout occurred after 2 seconds (Bark Skipped)")
+    def on_done(fut):
+        try:
+            fut.result()
+        except (asyncio.TimeoutError, TimeoutError):
+            print("[AUDIO] Timeout occurred after 2 seconds (Bark Skipped)")
+        except Exception as e:
+            print(f"[AUDIO] Error triggering bark: {e}")
+
+    try:
+        # Submit the work to the background loop without waiting for it
+        bark_future = audio_session.submit(play_coro())
+        bark_future.add_done_callback(on_done)
     except Exception as e:
         print(f"[AUDIO] Error triggering bark: {e}")
 
 # -------------------- Main --------------------
 def main():
-    # --- MODIFIED: Start Audio in Background Thread ---
-    audio_thread = threading.Thread(target=start_audio_service, daemon=True)
-    audio_thread.start()
+    global sport_client
+
+    # ------------------------------------------------------------
+    # Initialize all system components using SystemInit
+    # ------------------------------------------------------------
+    sys = SystemInit(AppConfig)
+
+    # First, while this is still the only thread: later threads inherit its CPU mask
+    placement = sys.init_placement()
+
+    # --- Attach audio to the shared WebRTC session (runs in its own thread) ---
+    start_audio_service()
 
     # Wait briefly for audio to initialize (optional, but prevents 'None' errors immediately)
     print("[SYS] Waiting for audio connection...")
@@ -120,20 +151,44 @@ def main():
 
     signal.signal(signal.SIGINT, handle_sigint)
 
-    # ------------------------------------------------------------
-    # Initialize all system components using SystemInit
-    # ------------------------------------------------------------
-    sys = SystemInit(AppConfig)
-
-    state_manager, sport, avoid = sys.init_unitree(behavior)
-
-    follower = sys.init_follower(state_manager, avoid, behavior, stop_event)
+    profiler = sys.init_profiler(stop_event)
+    watchdog = sys.init_watchdog(stop_event, fallback=watchdog_fallback)
+    state_manager, sport, avoid, estop = sys.init_unitree(behavior, stop_event,
+                                                          watchdog=watchdog, placement=placement,
+                                                          profiler=profiler)
+    sport_client = sport
+    history, compensator = sys.init_latency()
+    telemetry = sys.init_telemetry()
+
+    follower = sys.init_follower(state_manager, avoid, behavior, stop_event,
+                                 history=history, watchdog=watchdog, telemetry=telemetry,
+                                 placement=placement)
     follower.stop_event = stop_event  # attach the real stop_event
 
     cam, model, names = sys.init_vision()
+    bufs = sys.init_buffers(model, names)
+
+    # Ordered, bounded cleanup shared by the e-stop and normal exit (API release is last)
+    estop.add_shutdown_step("close camera", cam.close, order=10)
+    if audio_session is not None:
+        estop.add_shutdown_step("close audio", audio_session.close, order=20)
+    estop.add_shutdown_step("close telemetry", telemetry.close, order=30)
     lock = sys.init_target_lock()
+    odom, visits = sys.init_visit_memory()
+    ranger, vx_profile, wz_profile = sys.init_approach(compensator.camera)
+
+    def visited(box):
+        """True if a candidate box projects onto an already-reached target."""
+        pose = odom.pose()
+        if pose is None:
+            return False
+        x, y = target_world_position(box, w, h, pose, compensator.camera,
+                                     AppConfig.TARGET_HEIGHT_M, AppConfig.CAM_OFFSET_X)
+        return visits.is_visited(x, y)
 
     print("[SYS] All systems initialized.")
+    placement.report()
+    placement.start_monitor(stop_event)
 
     # -------------------- FPS --------------------
     fps_t0, frames = time.time(), 0
@@ -142,16 +197,24 @@ def main():
     hold_until = 0.0
     last_announce = 0.0
 
+    # -------------------- APPROACH timing --------------------
+    approach_t0 = 0.0
+    last_ctrl_t = 0.0
+
     # -------------------- YOLO + state machine loop --------------------
     try:
         while not stop_event.is_set():
+            bufs.alloc.begin_frame()
 
-            frame = cam.get_frame()
+            t_loop = time.monotonic()
+            frame, t_capture = cam.get_frame_stamped()
             if frame is None:
                 time.sleep(0.01)
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
                 continue
+            watchdog.beat("capture")
+            capture_ms = (time.monotonic() - t_loop) * 1e3
 
             h, w = frame.shape[:2]
 
@@ -161,29 +224,27 @@ def main():
             rx2 = int(AppConfig.ROI_NORM[2] * w)
             ry2 = int(AppConfig.ROI_NORM[3] * h)
             roi_w = float(rx2 - rx1)
-            roi_h = float(ry2 - ry1)
             roi_cx = 0.5 * (rx1 + rx2)
 
             # Draw ROI color
             roi_col = (0, 255, 0) if behavior["mode"] in ("APPROACH", "HOLD") else (255, 255, 255)
             cv2.rectangle(frame, (rx1, ry1), (rx2, ry2), roi_col, 2)
 
-            # YOLO inference
-            res = model.predict(frame, imgsz=640, conf=AppConfig.MIN_CONF, verbose=False)[0]
+            # YOLO inference on the persistent letterboxed canvas (rectangular, stride-aligned)
+            t_inf = time.monotonic()
+            inp = bufs.letterbox.load(frame)
+            res = model.predict(inp, imgsz=bufs.letterbox.imgsz, conf=AppConfig.MIN_CONF, verbose=False)[0]
+            inference_s = time.monotonic() - t_inf
+            watchdog.beat("inference", inference_s)
 
-            # Collect candidates (only backpacks)
-            candidates = []
+            # Collect detections into the fixed-capacity buffers (candidates: target class only)
+            det = None
             if hasattr(res, 'boxes') and res.boxes is not None:
-                boxes = res.boxes.xyxy.cpu().numpy()
-                clss = res.boxes.cls.cpu().numpy().astype(int)
-                confs = res.boxes.conf.cpu().numpy()
-
-                for (x1, y1, x2, y2), cid, p in zip(boxes, clss, confs):
-                    if names.get(int(cid), "") != "chair" or p < AppConfig.MIN_CONF:
-                        continue
-                    if (y2 - y1) < (AppConfig.MIN_BOX_FRAC * h):
-                        continue
-                    candidates.append((float(p), (float(x1), float(y1), float(x2), float(y2))))
+                det = res.boxes.data
+            bufs.detections.fill_from(det, bufs.letterbox)
+            bufs.candidates.select_from(bufs.detections, bufs.target_cls,
+                                        AppConfig.MIN_CONF, AppConfig.MIN_BOX_FRAC * h)
+            candidates = bufs.candidates.view()
 
             now = time.time()
             mode = behavior["mode"]
@@ -191,16 +252,25 @@ def main():
             # Share ROI with motion thread
             behavior["roi_px"] = (rx1, ry1, rx2, ry2)
 
+            delay_ms = math.nan
+            range_m = math.nan
+
             # -------------------- FOLLOW MODE --------------------
             if mode == "FOLLOW":
-                if now - last_announce >= 0.5:
-                    print("In FOLLOW")
-                    last_announce = now
+                # A lock left over from an APPROACH aborted by the watchdog
+                if lock.active:
+                    lock.reset()
+
                 if now >= behavior["cooldown_until"]:
 
-                    if not lock.active and candidates:
-                        got = lock.acquire(candidates, roi_rect=(rx1, ry1, rx2, ry2))
+                    if not lock.active and len(candidates):
+                        got = lock.acquire(candidates, roi_rect=(rx1, ry1, rx2, ry2), exclude=visited)
                         if got:
+                            print("[FOLLOW] Target acquired → APPROACH")
+                            approach_t0 = last_ctrl_t = time.monotonic()
+                            ranger.reset()
+                            vx_profile.reset()
+                            wz_profile.reset()
                             behavior["mode"] = "APPROACH"
                             behavior["target_box"] = lock.box
                             behavior["vx"] = 0.0
@@ -208,10 +278,6 @@ def main():
 
             # -------------------- APPROACH MODE --------------------
             if mode == "APPROACH":
-                if now - last_announce >= 0.5:
-                    print("In APROACH")
-                    last_announce = now
-
                 if lock.active:
                     lock.update(candidates)
 
@@ -219,35 +285,47 @@ def main():
                     behavior["mode"] = "FOLLOW"
                     behavior["target_box"] = None
                 else:
-                    x1, y1, x2, y2 = lock.box
+                    # Predict where the box is now, not where it was at capture time
+                    t_ctrl = time.monotonic()
+                    delay_ms = compensator.measure(t_capture, t_ctrl) * 1e3
+                    x1, y1, x2, y2 = compensator.predict(lock.box, w, h, t_capture, t_ctrl)
                     cx = 0.5 * (x1 + x2)
-                    bh = float(y2 - y1)
                     ex = (cx - roi_cx) / max(roi_w, 2)
-                    print(ex)
-                    size_ratio = bh / max(roi_h, 1.0)
-                    ey = 1.0 - size_ratio
+                    dt = min(max(t_ctrl - last_ctrl_t, 0.0), 0.2)
+                    last_ctrl_t = t_ctrl
 
-                    # Yaw
-                    if abs(ex) < AppConfig.CENTER_TOL:
-                        wz_t = 0.0
-                    else:
-                        wz_t = -ex
+                    # Metric range from box height (optionally fused with UWB)
+                    uwb_dist = getattr(state_manager.remote_state, "distance_est", None)
+                    rng = ranger.estimate((x1, y1, x2, y2), h, AppConfig.TARGET_CLASS, uwb_dist)
+                    range_m = rng
+                    remaining = rng - AppConfig.STOP_RANGE_M
+
+                    # Yaw: remaining angle is the target bearing (inside CENTER_TOL counts as centred)
+                    bearing = 0.0 if abs(ex) < AppConfig.CENTER_TOL else compensator.camera.bearing(cx, w)
 
-                    # Forward/back
-                    if abs(ey) < AppConfig.SIZE_TOL:
+                    # Reached only once the profile has braked to (near) zero inside the band
+                    if abs(remaining) < AppConfig.RANGE_TOL_M and vx_profile.settled(AppConfig.HOLD_SETTLE_VX):
                         behavior["vx"] = 0.0
                         behavior["wz"] = 0.0
 
                         hold_until = now + AppConfig.HOLD_SECONDS
                         behavior["mode"] = "HOLD"
-                        print("[APPROACH] Target reached → HOLD")
+                        print(f"[APPROACH] Target reached in {t_ctrl - approach_t0:.2f}s → HOLD "
+                              f"({compensator.report()})")
+
+                        # Remember where this target is so it is not approached again
+                        pose = odom.pose()
+                        if pose is not None:
+                            tx, ty = target_world_position(lock.box, w, h, pose, compensator.camera,
+                                                           AppConfig.TARGET_HEIGHT_M, AppConfig.CAM_OFFSET_X)
+                            visits.add(tx, ty)
+                            print(f"[APPROACH] Visited target at ({tx:.2f}, {ty:.2f}), {len(visits)} remembered")
 
-                    elif ey > 0.0:
-                        behavior["vx"] = AppConfig.K_VX_FWD * min(ey, 1.0)
-                        behavior["wz"] = max(-AppConfig.MAX_WZ, min(AppConfig.MAX_WZ, wz_t))
                     else:
-                        behavior["vx"] = -AppConfig.K_VX_BACK * min(-ey, 1.0)
-                        behavior["wz"] = max(-AppConfig.MAX_WZ, min(AppConfig.MAX_WZ, wz_t))
+                        # Velocity/acceleration-limited profiles towards the stop band and bearing;
+                        # vx plans to stop half-way into the band so it ends inside with margin
+                        behavior["vx"] = vx_profile.step(remaining, dt, tol=0.5 * AppConfig.RANGE_TOL_M)
+                        behavior["wz"] = wz_profile.step(bearing, dt)
 
                     behavior["target_box"] = lock.box
                     cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 255), 3)
@@ -257,29 +335,25 @@ def main():
                 behavior["vx"] = 0.0
                 behavior["wz"] = 0.0
                 
-                # --- MODIFIED: Call new bark function ---
-                # We removed the arguments because it uses globals internally now
-                bark() 
-                # ----------------------------------------
+                # Non-blocking: keeps the capture/inference heartbeats inside their budgets
+                bark()
 
                 if now - last_announce >= 0.5:
-                    print("Found — holding position…")
                     sport.Hello()
                     last_announce = now
 
                 if now >= hold_until:
                     print("Found — returning to follow.")
                     behavior["mode"] = "FOLLOW"
-                    behavior["cooldown_until"] = now + AppConfig.COOLDOWN_SECONDS
+                    # Visited targets are filtered by position; keep the blanket cooldown only without odometry
+                    cooldown = AppConfig.COOLDOWN_SECONDS if odom.pose() is None else AppConfig.VISIT_REARM_SECONDS
+                    behavior["cooldown_until"] = now + cooldown
 
                     lock.reset()
                     behavior["target_box"] = None
 
             # Draw all YOLO detections
-            if res is not None and res.boxes is not None:
-                for b in res.boxes.xyxy.cpu().numpy():
-                    x1, y1, x2, y2 = map(int, b)
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 1)
+            bufs.detections.draw(frame, (0, 255, 0), 1)
 
             # FPS
             frames += 1
@@ -294,6 +368,17 @@ def main():
                             cv2.LINE_AA)
                 fps_t0 = now
                 frames = 0
+
+            # Telemetry (non-blocking; written by a background thread)
+            uwb = state_manager.remote_state
+            telemetry.record_frame(
+                t_capture, behavior["mode"], behavior["vx"], behavior["wz"], lock.box,
+                getattr(uwb, "distance_est", None), getattr(uwb, "orientation_est", None),
+                capture_ms, inference_s * 1e3, (time.monotonic() - t_loop) * 1e3,
+                delay_ms, bufs.detections.count, range_m,
+            )
+
+            bufs.alloc.end_frame()
      
         # cv2.imshow(AppConfig.WIN_NAME, frame)
         # if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -302,11 +387,12 @@ def main():
 
     finally:
         stop_event.set()
-        avoid.Move(0.0, 0.0, 0.0)
-        avoid.UseRemoteCommandFromApi(False)
-        cam.close()
+        if not estop.engaged:
+            avoid.Move(0.0, 0.0, 0.0)
         cv2.destroyAllWindows()
         follower.join(timeout=1.0)
+        # Same ordered sequence as the e-stop; runs once even if both paths get here
+        estop.shutdown()
         print("[SYS] Shutdown complete.")
 
 